@@ -1,8 +1,16 @@
+import sys
+
+if __name__ == "__main__" and "--profile-startup" in sys.argv:
+    # Installed before the other imports so they are timed too
+    from startup_profiler import profiler
+    profiler.install()
+
 from typing import Dict, Tuple, Optional, Callable
 import tkinter as tk
+from tkinter import messagebox
 import customtkinter as ctk
 from button_commands import Button_Commands
-from utils import utils
+from utils import utils, BUTTON_SPRITES
 from PIL import Image, ImageTk
 from dataclasses import dataclass
 
@@ -16,6 +24,7 @@ class WindowConfig:
     MIN_HEIGHT = 450
     WIDTH = 800
     HEIGHT = 550
+    PRELOAD_DELAY_MS = 300  # Start warming window assets this long after first paint
 
 
 @dataclass
@@ -26,6 +35,16 @@ class FrameConfig:
     PADDING = 5
 
 
+@dataclass
+class SelectorConfig:
+    """Game selector styling configuration"""
+    NEW_GAME_LABEL = "+ New Game"
+    FG_COLOR = "#2A332A"
+    BORDER_COLOR = "#3E4A3E"
+    TEXT_COLOR = "white"
+    FONT = ("Arial", 12, "bold")
+
+
 @dataclass
 class ButtonPlacement:
     """Button placement configuration"""
@@ -58,8 +77,14 @@ class ImageLabel:
             self.last_size['width'] = event.width
             self.last_size['height'] = event.height
             
-            self.current_image = utils.resize_image(self.image_path, event.width, event.height)
-            self.label.config(image=self.current_image)
+            utils.resize_scheduler.schedule(
+                self.label, self.image_path, event.width, event.height, self._set_image
+            )
+    
+    def _set_image(self, image: Optional[ImageTk.PhotoImage]):
+        """Show the resized image once the resize has settled (None clears it)"""
+        self.current_image = image
+        self.label.config(image=self.current_image or "")
 
 
 class MainFrame:
@@ -96,10 +121,9 @@ class MainFrame:
     
     def _create_background(self):
         """Create background image"""
-        self.bg_image = ImageTk.PhotoImage(
-            Image.open("images/background_image.png").resize((1360, 600))
-        )
-        background_label = tk.Label(self.frame, image=self.bg_image)
+        background_label = tk.Label(self.frame)
+        self.bg_image = utils.shared_image(background_label, "images/background_image.png", 1360, 600)
+        background_label.config(image=self.bg_image)
         background_label.grid(row=0, column=0, rowspan=5, columnspan=5)
     
     def _create_button_frames(self):
@@ -125,20 +149,20 @@ class MainFrame:
     def _create_buttons(self):
         """Create all buttons"""
         button_specs = [
-            ("start", (82, 65), lambda: self.button_commands.start_button_command(self._get_root())),
-            ("roles", (86, 48), lambda: self.button_commands.roles_button_command(self._get_root())),
-            ("prompts", (97, 85), lambda: self.button_commands.prompts_button_command(self._get_root())),
-            ("night", (97, 85), lambda: self.button_commands.night_button_command(self._get_root())),
-            ("day", (97, 85), lambda: self.button_commands.day_button_command(self._get_root())),
-            ("reset", (85, 75), lambda: self.button_commands.reset_button_command())
+            ("start", lambda: self.button_commands.start_button_command(self._get_root())),
+            ("roles", lambda: self.button_commands.roles_button_command(self._get_root())),
+            ("prompts", lambda: self.button_commands.prompts_button_command(self._get_root())),
+            ("night", lambda: self.button_commands.night_button_command(self._get_root())),
+            ("day", lambda: self.button_commands.day_button_command(self._get_root())),
+            ("reset", lambda: self.button_commands.reset_button_command())
         ]
         
-        for name, size, command in button_specs:
+        for name, command in button_specs:
             btn_name = f"{name}_button"
             frame = self.button_frames[f"{btn_name}_frame"]
             
-            image_1 = Image.open(f"{btn_name}/frame_1.png")
-            image_2 = Image.open(f"{btn_name}/frame_2.png")
+            _, size = BUTTON_SPRITES[btn_name]
+            image_1, image_2 = utils.button_images(btn_name)
             
             button = utils.Custom_Buttons(frame, image_1, image_2, size, command)
             button.place(
@@ -157,6 +181,41 @@ class MainFrame:
         return widget
 
 
+class GameSelector:
+    """Combobox switching the dashboard between the games in utils.sessions"""
+    
+    def __init__(self, parent: tk.Misc):
+        self.game_var = tk.StringVar(value=utils.sessions.current.name)
+        self.combo = ctk.CTkComboBox(
+            parent,
+            variable=self.game_var,
+            values=self._values(),
+            command=self._on_select,
+            state="readonly",
+            fg_color=SelectorConfig.FG_COLOR,
+            border_color=SelectorConfig.BORDER_COLOR,
+            button_color=SelectorConfig.BORDER_COLOR,
+            text_color=SelectorConfig.TEXT_COLOR,
+            font=SelectorConfig.FONT
+        )
+        self.combo.place(relx=0.79, rely=0.015, relwidth=0.2, relheight=0.05)
+    
+    def _values(self):
+        """Game names followed by the new game entry"""
+        return [session.name for session in utils.sessions.sessions()] + [SelectorConfig.NEW_GAME_LABEL]
+    
+    def _on_select(self, choice: str):
+        """Bind the dashboard to the chosen game, creating one if asked"""
+        if choice == SelectorConfig.NEW_GAME_LABEL:
+            utils.sessions.new()
+        else:
+            session = utils.sessions.find_by_name(choice)
+            if session is not None:
+                utils.sessions.select(session.id)
+        self.combo.configure(values=self._values())
+        self.game_var.set(utils.sessions.current.name)
+
+
 class MainApplication:
     """Main application controller"""
     
@@ -167,6 +226,9 @@ class MainApplication:
         self._setup_window()
         self._create_title_frame()
         self._create_main_frame()
+        self._create_game_selector()
+        self._schedule_preload()
+        self._offer_restore()
     
     def _setup_window(self):
         """Configure the main window"""
@@ -203,14 +265,53 @@ class MainApplication:
         """Create the main content frame"""
         MainFrame(self.root, self.button_commands)
     
+    def _create_game_selector(self):
+        """Create the selector for switching between games"""
+        self.game_selector = GameSelector(self.root)
+    
+    def _offer_restore(self):
+        """Offer to continue the last unfinished game once the window is up"""
+        utils.sessions.prune_saves()
+        path = utils.sessions.latest_save()
+        if path is None:
+            return
+        
+        def ask():
+            if not messagebox.askyesno("Restore", "Continue the last unfinished game?"):
+                return
+            try:
+                utils.sessions.restore(path)
+            except (OSError, ValueError) as e:
+                print(f"Error restoring {path}: {e}")
+                messagebox.showerror("Restore", f"Could not restore the saved game: {e}")
+        
+        self.root.after_idle(ask)
+    
+    def _schedule_preload(self):
+        """Warm up the phase windows' images once the main window has been painted"""
+        self.root.after_idle(
+            lambda: self.root.after(WindowConfig.PRELOAD_DELAY_MS, utils.asset_preloader.start)
+        )
+    
     def run(self):
         """Start the application"""
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            utils.sessions.shutdown()
 
 
 def main():
-    """Application entry point"""
+    """
+    Application entry point
+    
+    Pass --profile-startup to print per-module import times and the time
+    to first paint once the main window has been drawn.
+    """
     app = MainApplication()
+    if "--profile-startup" in sys.argv:
+        from startup_profiler import profiler
+        app.root.after_idle(lambda: app.root.after(0, profiler.mark_first_paint))
     app.run()
 
 
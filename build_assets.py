@@ -0,0 +1,85 @@
+"""
+build_assets.py - Pre-build derived image assets used at runtime
+
+Usage:
+    python build_assets.py            # build everything
+    python build_assets.py pyramid    # only the pre-scaled image pyramid
+    python build_assets.py atlas      # only the button sprite atlas
+    python build_assets.py pixels     # only the decoded pixel cache
+"""
+import argparse
+import os
+from typing import List, Optional
+from PIL import Image
+from utils import utils, BUTTON_SPRITES, PYRAMID_SOURCES
+
+
+def build_pyramid() -> None:
+    """Generate the pre-scaled levels for the large title and background art"""
+    pyramid = utils.image_cache.pyramid
+    if pyramid is None:
+        return
+    index = pyramid.build(PYRAMID_SOURCES)
+    for path in PYRAMID_SOURCES:
+        sizes = ", ".join(f"{w}x{h}" for w, h, _ in index[path]["levels"])
+        print(f"pyramid  {path}: {sizes or 'no levels'}")
+
+
+def build_atlas() -> None:
+    """Pack every button's normal and pressed frames into one sprite atlas"""
+    index = utils.button_atlas.build(BUTTON_SPRITES)
+    for name, entry in index.items():
+        _, _, width, height = entry["normal"]
+        print(f"atlas    {name}: {width}x{height}")
+
+
+def build_pixels() -> None:
+    """Decode the startup images and their pyramid levels into the pixel cache"""
+    pixel_cache = utils.image_cache.pixel_cache
+    if pixel_cache is None:
+        return
+    os.makedirs(pixel_cache.directory, exist_ok=True)
+
+    paths = list(PYRAMID_SOURCES)
+    if os.path.exists(utils.button_atlas.image_path):
+        paths.append(utils.button_atlas.image_path)
+    pyramid = utils.image_cache.pyramid
+    if pyramid is not None:
+        for path in PYRAMID_SOURCES:
+            paths.extend(pyramid.levels(path))
+
+    for path in paths:
+        image = Image.open(path)
+        image.load()
+        pixel_cache.store(path, image)
+        print(f"pixels   {path}: {image.width}x{image.height}")
+
+
+BUILDERS = {
+    "pyramid": build_pyramid,
+    "atlas": build_atlas,
+    "pixels": build_pixels,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Build derived image assets.")
+    parser.add_argument(
+        "targets",
+        nargs="*",
+        metavar="TARGET",
+        help=f"Assets to build: {', '.join(BUILDERS)} (default: all)"
+    )
+    args = parser.parse_args(argv)
+
+    unknown = [t for t in args.targets if t not in BUILDERS]
+    if unknown:
+        parser.error(f"unknown target(s): {', '.join(unknown)}")
+
+    for target in args.targets or list(BUILDERS):
+        BUILDERS[target]()
+
+
+if __name__ == "__main__":
+    main()
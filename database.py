@@ -1,6 +1,270 @@
-from tkinter import messagebox
-import windows.prompts.all_prompts as all_prompts
-from typing import List, Tuple, Optional
+import itertools
+from enum import Enum
+from typing import Dict, Iterable, List, Set, Tuple, Optional
+from token_estimator import TokenCounter, get_counter
+
+
+class Role(str, Enum):
+    """Player roles; compares equal to its lowercase name"""
+    UNASSIGNED = ""
+    VILLAGER = "villager"
+    MAFIA = "mafia"
+    SHERIFF = "sheriff"
+    DOCTOR = "doctor"
+
+    @classmethod
+    def parse(cls, role: str) -> 'Role':
+        """Get the role for a (case-insensitive) role name"""
+        return cls(role.lower()) if role else cls.UNASSIGNED
+
+
+# Assignable roles; an empty string marks a slot with no role yet
+ROLES = tuple(role.value for role in Role if role is not Role.UNASSIGNED)
+
+# Version stamps for change tracking; unique across every game so stamps never collide
+_versions = itertools.count(1)
+
+
+class Player:
+    """
+    One seat at the table
+    
+    Slotted so that rosters stay small when many games are held in memory;
+    the role is one of the shared Role members rather than a string per player.
+    """
+    __slots__ = ("name", "role", "seat", "alive", "stats")
+    
+    def __init__(self, name: str = "", role: Role = Role.UNASSIGNED, seat: int = 0,
+                 alive: bool = True, stats: Optional[Dict[str, int]] = None):
+        self.name = name
+        self.role = role
+        self.seat = seat
+        self.alive = alive
+        self.stats = stats  # Per-game counters, created on first use
+
+    def record(self, stat: str, amount: int = 1) -> None:
+        """Add amount to one of the player's per-game counters"""
+        if self.stats is None:
+            self.stats = {}
+        self.stats[stat] = self.stats.get(stat, 0) + amount
+
+    def copy(self) -> 'Player':
+        """Get an independent copy of this record"""
+        return Player(self.name, self.role, self.seat, self.alive,
+                      None if self.stats is None else dict(self.stats))
+
+    def __repr__(self) -> str:
+        state = "" if self.alive else ", eliminated"
+        return f"Player({self.seat}: {self.name!r}, {self.role.value or 'unassigned'}{state})"
+
+
+class VoteLedger:
+    """
+    Votes recorded per voter, with O(1) cast, change and retract
+    
+    Tallies are bucketed by vote count so the current leader and runner-up
+    are kept up to date incrementally instead of sorting every time. Ties
+    are broken alphabetically. Every change is appended to an audit trail.
+    """
+    
+    def __init__(self):
+        self.ballots: Dict[str, str] = {}           # voter -> votee (lowercase)
+        self.tallies: Dict[str, int] = {}           # votee -> number of votes
+        self.audit: List[Tuple[int, str, Optional[str], Optional[str], Optional[str]]] = []
+        self._buckets: Dict[int, Set[str]] = {}     # vote count -> votees with that count
+        self._max_count: int = 0
+        self.anonymous_count: int = 0               # anonymous voters so far, for their ids
+        self.version: int = next(_versions)         # changes whenever the ballots change
+
+    def cast(self, voter: Optional[str], votee: str) -> None:
+        """
+        Record voter's vote for votee, replacing voter's previous vote
+        
+        A voter of None records an anonymous vote that can't be changed.
+        """
+        if voter is None:
+            self.anonymous_count += 1
+            voter = f"#{self.anonymous_count}"
+        voter, votee = voter.lower(), votee.lower()
+        previous = self.ballots.get(voter)
+        if previous == votee:
+            return
+        if previous is not None:
+            self._change_tally(previous, -1)
+        self.ballots[voter] = votee
+        self._change_tally(votee, 1)
+        self._record("change" if previous else "cast", voter, previous, votee)
+
+    def retract(self, voter: str) -> Optional[str]:
+        """Withdraw voter's vote; returns who the vote was for, if any"""
+        voter = voter.lower()
+        previous = self.ballots.pop(voter, None)
+        if previous is not None:
+            self._change_tally(previous, -1)
+            self._record("retract", voter, previous, None)
+        return previous
+
+    def clear(self) -> None:
+        """Drop every vote, keeping the audit trail"""
+        self.ballots = {}
+        self.tallies = {}
+        self._buckets = {}
+        self._max_count = 0
+        self._record("clear", None, None, None)
+
+    def load(self, ballots: Iterable[Tuple[str, str]], anonymous_count: int) -> None:
+        """Replace every vote with ballots (e.g. on undo), keeping the audit trail"""
+        self.ballots = {}
+        self.tallies = {}
+        self._buckets = {}
+        self._max_count = 0
+        for voter, votee in ballots:
+            self.ballots[voter] = votee
+            self._change_tally(votee, 1)
+        self.anonymous_count = anonymous_count
+        self._record("restore", None, None, None)
+
+    def total(self) -> int:
+        """Number of votes currently cast"""
+        return len(self.ballots)
+
+    def leader(self) -> Optional[Tuple[str, int]]:
+        """Get (votee, votes) of the player with the most votes, or None"""
+        if not self._max_count:
+            return None
+        return min(self._buckets[self._max_count]), self._max_count
+
+    def runner_up(self) -> Optional[Tuple[str, int]]:
+        """Get (votee, votes) of the player ranked second, or None"""
+        if not self._max_count:
+            return None
+        top = self._buckets[self._max_count]
+        if len(top) > 1:
+            # Second smallest name, in one pass
+            first = second = None
+            for votee in top:
+                if first is None or votee < first:
+                    first, second = votee, first
+                elif second is None or votee < second:
+                    second = votee
+            return second, self._max_count
+        for count in range(self._max_count - 1, 0, -1):
+            if self._buckets.get(count):
+                return min(self._buckets[count]), count
+        return None
+
+    def _change_tally(self, votee: str, delta: int) -> None:
+        """Move votee to the neighbouring vote-count bucket"""
+        old = self.tallies.get(votee, 0)
+        new = old + delta
+        if old:
+            self._buckets[old].discard(votee)
+        if new:
+            self.tallies[votee] = new
+            self._buckets.setdefault(new, set()).add(votee)
+        else:
+            del self.tallies[votee]
+        
+        # Counts move by one, so the maximum can only shift by one
+        if new > self._max_count:
+            self._max_count = new
+        elif old == self._max_count and not self._buckets.get(old):
+            self._max_count = old - 1
+
+    def _record(self, action: str, voter: Optional[str], old: Optional[str], new: Optional[str]) -> None:
+        """Append an entry to the audit trail"""
+        self.version = next(_versions)
+        self.audit.append((len(self.audit) + 1, action, voter, old, new))
+
+
+class Transcript:
+    """
+    Dialogues of the current phase, one numbered line per speaker
+    
+    Each line is formatted once, when it is said; a speaker talking again
+    replaces their line in place and keeps its number. The joined text is
+    built only when asked for after a change, and head() reads just the
+    start of it, so previews cost the same however long the discussion gets.
+    Token counts are kept the same way: each line is counted when it is
+    said and added to a running total.
+    """
+    EMPTY = "None"  # Text of a transcript nobody has spoken in
+    
+    def __init__(self):
+        self.dialogues: Dict[str, str] = {}     # speaker -> message, in speaking order
+        self._lines: List[str] = []             # formatted lines, in speaking order
+        self._line_of: Dict[str, int] = {}      # speaker -> index in _lines
+        self._text: Optional[str] = self.EMPTY  # joined lines, None until rebuilt
+        self.version: int = next(_versions)     # changes whenever a dialogue changes
+        self._line_tokens: List[int] = []       # tokens of each line, by _counter
+        self._tokens: int = 0                   # sum of _line_tokens
+        self._counter: Optional[TokenCounter] = None
+
+    def add(self, speaker: str, message: str) -> None:
+        """Record what speaker said, replacing what they said before"""
+        index = self._line_of.get(speaker)
+        if index is None:
+            index = self._line_of[speaker] = len(self._lines)
+            self._lines.append("")
+            self._line_tokens.append(0)
+        line = self._lines[index] = f"{index + 1}. {speaker.title()}: {message}"
+        if self._counter is not None:
+            tokens = self._counter(line)
+            self._tokens += tokens - self._line_tokens[index]
+            self._line_tokens[index] = tokens
+        self.dialogues[speaker] = message
+        self._text = None
+        self.version = next(_versions)
+
+    def load(self, dialogues: Iterable[Tuple[str, str]]) -> None:
+        """Replace every dialogue with (speaker, message) pairs, in speaking order"""
+        self.clear()
+        for speaker, message in dialogues:
+            self.add(speaker, message)
+
+    def clear(self) -> None:
+        """Drop every dialogue"""
+        self.dialogues = {}
+        self._lines = []
+        self._line_of = {}
+        self._line_tokens = []
+        self._tokens = 0
+        self._text = self.EMPTY
+        self.version = next(_versions)
+
+    @property
+    def text(self) -> str:
+        """All lines, one per speaker, or "None" if nobody spoke"""
+        if self._text is None:
+            self._text = "\n".join(self._lines)
+        return self._text
+
+    def head(self, length: int) -> str:
+        """The start of text, at least length characters long unless text is shorter"""
+        if self._text is not None or len(self._lines) < 2:
+            return self.text[:length]
+        lines, size = [], 0
+        for line in self._lines:
+            lines.append(line)
+            size += len(line) + 1
+            if size > length:
+                break
+        return "\n".join(lines)
+
+    def token_count(self) -> int:
+        """Tokens of text, as counted by the token estimator's counter"""
+        counter = get_counter()
+        if counter is not self._counter:
+            # First count, or the counter was swapped: count every line once
+            self._counter = counter
+            self._line_tokens = [counter(line) for line in self._lines]
+            self._tokens = sum(self._line_tokens)
+        if not self._lines:
+            return counter(self.EMPTY)
+        return self._tokens + len(self._lines) - 1  # One per line break
+
+    def __len__(self) -> int:
+        return len(self._lines)
 
 
 class Database:
@@ -11,32 +275,199 @@ class Database:
         self.total_mafias: int = 1
         self.players_left: int = 4
         self.mafias_left: int = 1
-        self.players_list: List[Tuple[str, str]] = [('', '')] * self.total_players
-        self.mafias_list: List[str] = []
-        self.sheriff: Optional[str] = None
-        self.doctor: Optional[str] = None
         self.first_disable: bool = False
-        self.eliminated_players: List[str] = []
-        self.prompts = all_prompts.all_prompts_dict
+        
+        # One record per seat; eliminated players stay in their seat with alive=False
+        self.roster: List[Player] = [Player(seat=seat) for seat in range(self.total_players)]
+        self._eliminated_seats: List[int] = []      # in elimination order
+        
+        # Indexes over the roster, kept consistent by every mutation below
+        self._name_index: Dict[str, int] = {}       # lowercase name -> seat
+        self._role_index: Dict[Role, Set[str]] = {} # role -> names of living players holding it
+        
+        # Live counters over living players: players per role ('' = unassigned)
+        self.role_counts: Dict[str, int] = {}
+        
+        # Derived views, rebuilt lazily after the roster changes
+        self.version: int = next(_versions)         # changes whenever the roster changes
+        self._players_view: Optional[List[Tuple[str, str]]] = None
+        self._mafias_view: Optional[List[str]] = None
+        self._reindex()
+
+    @property
+    def prompts(self) -> dict:
+        """All prompt templates, imported the first time a prompt is needed"""
+        from windows.prompts import all_prompts
+        return all_prompts.all_prompts_dict
+
+    @property
+    def players_list(self) -> List[Tuple[str, str]]:
+        """(name, role) of every player still in the game, in seat order"""
+        if self._players_view is None:
+            self._players_view = [(p.name, p.role.value) for p in self.roster if p.alive]
+        return self._players_view
+
+    @property
+    def mafias_list(self) -> List[str]:
+        """Names of the mafias still in the game, in seat order"""
+        if self._mafias_view is None:
+            self._mafias_view = [p.name for p in self.roster if p.alive and p.role is Role.MAFIA]
+        return self._mafias_view
+
+    @property
+    def sheriff(self) -> Optional[str]:
+        """Name of the sheriff if still in the game"""
+        return next(iter(self._role_index.get(Role.SHERIFF, ())), None)
+
+    @property
+    def doctor(self) -> Optional[str]:
+        """Name of the doctor if still in the game"""
+        return next(iter(self._role_index.get(Role.DOCTOR, ())), None)
+
+    @property
+    def eliminated_players(self) -> List[str]:
+        """Names of eliminated players, in elimination order"""
+        return [self.roster[seat].name for seat in self._eliminated_seats]
+
+    @property
+    def eliminated_seats(self) -> Tuple[int, ...]:
+        """Seats of eliminated players, in elimination order"""
+        return tuple(self._eliminated_seats)
+
+    def load_roster(self, roster: List[Player], eliminated_seats: List[int]) -> None:
+        """Replace the whole roster, e.g. when restoring a saved game"""
+        self.roster = roster
+        self._eliminated_seats = list(eliminated_seats)
+        self._reindex()
+        self.calculate_left()
 
     def change_player_num(self, player_num: int) -> None:
         """Update total number of players"""
         self.total_players = player_num
         self.players_left = player_num
-        self.players_list = [('', '')] * player_num
-        self.change_msd(self.players_list)
+        self.roster = [Player(seat=seat) for seat in range(player_num)]
+        self._eliminated_seats = []
+        self._reindex()
+
+    def find_player(self, name: str) -> Optional[int]:
+        """Get the seat of a player still in the game (case-insensitive), or None"""
+        seat = self._name_index.get(name.lower()) if name else None
+        if seat is None or not self.roster[seat].alive:
+            return None
+        return seat
+
+    def player(self, name: str) -> Optional[Player]:
+        """Get the record of a player (case-insensitive), eliminated or not"""
+        seat = self._name_index.get(name.lower()) if name else None
+        return None if seat is None else self.roster[seat]
+
+    def role_of(self, name: str) -> Optional[str]:
+        """Get the role of a player still in the game (case-insensitive), or None"""
+        seat = self.find_player(name)
+        return None if seat is None else self.roster[seat].role.value
+
+    def players_with_role(self, role: str) -> Set[str]:
+        """Get the names of players still in the game holding role"""
+        return self._role_index.get(Role.parse(role), set())
+
+    def is_eliminated(self, name: str) -> bool:
+        """Check whether a player has been eliminated (case-insensitive)"""
+        player = self.player(name)
+        return player is not None and not player.alive
+
+    def eliminate_player(self, name: str) -> bool:
+        """
+        Mark a player as eliminated, keeping their seat
+        
+        Returns:
+            True if the player was found and eliminated
+        """
+        seat = self.find_player(name)
+        if seat is None:
+            return False
+        self._unindex_seat(seat)
+        self.roster[seat].alive = False
+        namesake = next((p for p in self._seats_named(name) if p.alive), None)
+        if namesake is not None:
+            self._name_index[name.lower()] = namesake.seat  # Keep a namesake still in the game findable
+        self._eliminated_seats.append(seat)
+        self._invalidate_views()
+        self.calculate_left()
+        return True
+
+    def _reindex(self) -> None:
+        """Rebuild every index from the roster"""
+        self._name_index = {}
+        self._role_index = {}
+        self.role_counts = dict.fromkeys(("",) + ROLES, 0)
+        for player in self.roster:
+            if player.name:
+                self._name_index[player.name.lower()] = player.seat
+            if player.alive:
+                self._index_seat(player.seat)
+        self._invalidate_views()
+
+    def _index_seat(self, seat: int) -> None:
+        """Add one living player to the indexes"""
+        player = self.roster[seat]
+        if player.name:
+            self._name_index[player.name.lower()] = seat
+        if player.role is not Role.UNASSIGNED:
+            self._role_index.setdefault(player.role, set()).add(player.name)
+        self.role_counts[player.role.value] += 1
+
+    def _unindex_seat(self, seat: int) -> None:
+        """Remove the living player in seat from the role indexes"""
+        player = self.roster[seat]
+        if player.role is not Role.UNASSIGNED and not any(
+                other.alive and other.seat != seat and other.name == player.name and other.role is player.role
+                for other in self._seats_named(player.name)):
+            self._role_index.get(player.role, set()).discard(player.name)
+        self.role_counts[player.role.value] -= 1
+
+    def _seats_named(self, name: str) -> List[Player]:
+        """Players whose name is name (case-insensitive); a scan, only needed for duplicate names"""
+        key = name.lower()
+        return [player for player in self.roster if player.name and player.name.lower() == key]
+
+    def _repoint_name(self, seat: int) -> None:
+        """
+        Point the name index entry of seat's player at another seat with the
+        same name (a living one if there is), or drop it if there is none
+        """
+        key = self.roster[seat].name.lower()
+        if self._name_index.get(key) != seat:
+            return
+        others = [player for player in self._seats_named(key) if player.seat != seat]
+        if others:
+            self._name_index[key] = next((p for p in others if p.alive), others[0]).seat
+        else:
+            del self._name_index[key]
+
+    def _set_seat(self, seat: int, name: str, role: Role) -> None:
+        """Replace the name and role in seat, keeping the indexes consistent"""
+        player = self.roster[seat]
+        self._unindex_seat(seat)
+        if player.name:
+            self._repoint_name(seat)
+        player.name = name
+        player.role = role
+        self._index_seat(seat)
+        self._invalidate_views()
+
+    def _invalidate_views(self) -> None:
+        """Drop the cached players and mafias lists"""
+        self.version = next(_versions)
+        self._players_view = None
+        self._mafias_view = None
 
     def calculate_left(self) -> None:
-        self.players_left = 0
-        self.mafias_left = 0
-        for _, role in self.players_list:
-            if role.lower() == "mafia":
-                self.mafias_left += 1
-            else:
-                self.players_left += 1
-        self.change_msd(self.players_list)
+        """Update the players (town) and mafias left from the live role counters"""
+        self.mafias_left = self.role_counts['mafia']
+        self.players_left = sum(self.role_counts.values()) - self.mafias_left
 
     def check_win(self) -> dict[str, bool]:
+        self.calculate_left()
         result = {
             "town_win" : False,
             "mafia_win" : False
@@ -60,10 +491,17 @@ class Database:
             List of booleans indicating if each constraint is satisfied:
             [mafia_count_valid, sheriff_count_valid, doctor_count_valid, enough_slots]
         """
-        mafia_count = sum(1 for _, role in lst if role.lower() == 'mafia')
-        sheriff_count = sum(1 for _, role in lst if role.lower() == 'sheriff')
-        doctor_count = sum(1 for _, role in lst if role.lower() == 'doctor')
-        remaining_slots = sum(1 for _, role in lst if role == '')
+        counts = dict.fromkeys(("",) + ROLES, 0)
+        for _, role in lst:
+            counts[role.lower()] = counts.get(role.lower(), 0) + 1
+        return self._check_role_counts(counts)
+
+    def _check_role_counts(self, counts: Dict[str, int]) -> List[bool]:
+        """Validate role counters, see player_num_checker"""
+        mafia_count = counts['mafia']
+        sheriff_count = counts['sheriff']
+        doctor_count = counts['doctor']
+        remaining_slots = counts['']
         
         mafia_left = self.total_mafias - mafia_count
         sheriff_left = 1 - sheriff_count
@@ -85,10 +523,13 @@ class Database:
         """
         if not (1 <= position <= self.total_players):
             raise ValueError("Invalid Position!")
+        new_role = Role.parse(role)
         
-        test_list = self.players_list[:]
-        test_list[position - 1] = (name, role)
-        result = self.player_num_checker(test_list)
+        # Validate against the counters as they would be after the change
+        counts = dict(self.role_counts)
+        counts[self.roster[position - 1].role.value] -= 1
+        counts[new_role.value] += 1
+        result = self._check_role_counts(counts)
         
         if not all(result):
             error_msgs = []
@@ -102,32 +543,23 @@ class Database:
                 error_msgs.append("Not enough remaining slots for required roles")
             raise ValueError(", ".join(error_msgs))
         
-        self.players_list[position - 1] = (name, role)
-        self.change_msd(self.players_list)
-
-    def change_msd(self, player_list: List[Tuple[str, str]]) -> None:
-        """Update mafias list, sheriff, and doctor based on player list"""
-        self.mafias_list = []
-        self.sheriff = None
-        self.doctor = None
+        self._set_seat(position - 1, name, new_role)
+
+    def change_msd(self, player_list: Optional[List[Tuple[str, str]]] = None) -> None:
+        """
+        Re-sync the mafias list, sheriff, and doctor with the roster
         
-        for name, role in player_list:
-            role_lower = role.lower()
-            if role_lower == 'mafia':
-                self.mafias_list.append(name)
-            elif role_lower == 'sheriff':
-                self.sheriff = name
-            elif role_lower == 'doctor':
-                self.doctor = name
+        They are derived from the roster, so player_list is ignored and only
+        kept for compatibility with older callers.
+        """
+        self._reindex()
     
     def change_player_name(self, name: str, position: int) -> None:
         """Update player name at given position without changing role"""
         if not (1 <= position <= self.total_players):
             raise ValueError("Invalid Position!")
         
-        _, role = self.players_list[position - 1]
-        self.players_list[position - 1] = (name, role)
-        self.change_msd(self.players_list)
+        self._set_seat(position - 1, name, self.roster[position - 1].role)
         
     def change_first_disable(self) -> None:
         """Toggle first_disable flag"""
@@ -145,59 +577,77 @@ class Database:
             self.day_number: int = 1
             self.night_phase: int = 1
             self.day_phase: int = 1
-            self.dialogues: dict[str, str] = {}
-            self.votes: dict[str, int] = {}
+            self.transcript = Transcript()
+            self.vote_ledger = VoteLedger()
             self.doctor_save: Optional[str] = None
             self.day_message: str = ""
             self.eliminated_this_night: Optional[str] = None
             
+        @property
+        def dialogues(self) -> dict[str, str]:
+            """Dialogue per speaker (read-only view of the transcript)"""
+            return self.transcript.dialogues
+
+        @property
+        def dialogues_version(self) -> int:
+            """Changes whenever dialogues change"""
+            return self.transcript.version
+
         def add_dialogue(self, speaker: str, message: str) -> None:
             """Record dialogue from a speaker"""
-            self.dialogues[speaker] = message
+            self.transcript.add(speaker, message)
 
         def get_dialogues(self) -> str:
             """Get formatted string of all dialogues"""
-            if not self.dialogues:
-                return "None"
-            
-            lines = [f"{i + 1}. {speaker.title()}: {message}" 
-                    for i, (speaker, message) in enumerate(self.dialogues.items())]
-            return "\n".join(lines)
+            return self.transcript.text
 
         def clear_dialogues(self) -> None:
             """Clear all dialogues"""
-            self.dialogues = {}
+            self.transcript.clear()
+
+        @property
+        def votes(self) -> dict[str, int]:
+            """Current vote count per player (read-only view of the ledger)"""
+            return self.vote_ledger.tallies
 
-        def add_vote(self, votee: str) -> None:
-            """Add a vote for a player"""
-            votee_lower = votee.lower()
-            self.votes[votee_lower] = self.votes.get(votee_lower, 0) + 1
+        def add_vote(self, votee: str, voter: Optional[str] = None) -> None:
+            """Add a vote for a player, replacing voter's previous vote if any"""
+            self.vote_ledger.cast(voter, votee)
 
-        def most_voted(self) -> Tuple[Optional[str], str]:
+        def retract_vote(self, voter: str) -> None:
+            """Withdraw voter's vote"""
+            self.vote_ledger.retract(voter)
+
+        def most_voted(self, apply_doctor_save: bool = True) -> Tuple[Optional[str], str]:
             """
             Get the player with most votes, considering doctor save.
             Prevents multiple eliminations in the same night.
             
+            Args:
+                apply_doctor_save: Whether the doctor's save protects the leader
+                    (night votes); day votes are not affected by it
+            
             Returns:
                 Tuple of (player_name, message) or (None, reason) if no clear winner
             """
-            if not self.votes:
+            leader = self.vote_ledger.leader()
+            if leader is None:
                 return None, "No votes recorded"
             
             # Check if someone was already eliminated this night
             if self.eliminated_this_night:
                 return None, f"A player has already been eliminated this night ({self.eliminated_this_night.title()})."
             
-            # Sort players by vote count (descending) and then alphabetically for consistency
-            sorted_votes = sorted(self.votes.items(), key=lambda x: (-x[1], x[0]))
-            most_voted_player, vote_count = sorted_votes[0]
-            total_votes = sum(self.votes.values())
+            # Ledger ranks by vote count (descending) and then alphabetically for consistency
+            most_voted_player, vote_count = leader
+            total_votes = self.vote_ledger.total()
             
             # Check if the doctor saved the most-voted player
-            if self.doctor_save and most_voted_player.lower() == self.doctor_save.lower():
-                if len(sorted_votes) > 1:
+            if apply_doctor_save and self.doctor_save and most_voted_player.lower() == self.doctor_save.lower():
+                runner_up = self.vote_ledger.runner_up()
+                if runner_up is not None:
                     # If there is another player with votes, consider them next
-                    next_player, next_vote_count = sorted_votes[1]
+                    next_player, next_vote_count = runner_up
                     self.eliminated_this_night = next_player
                     return next_player, f"{next_player.title()} was eliminated with {next_vote_count} votes (doctor saved {most_voted_player.title()})."
                 return None, f"No elimination (doctor saved {most_voted_player.title()})."
@@ -208,7 +658,7 @@ class Database:
 
         def clear_votes(self) -> None:
             """Clear all votes"""
-            self.votes = {}
+            self.vote_ledger.clear()
 
         def reset_night_state(self) -> None:
             """Reset night elimination tracking for a new night"""
@@ -233,17 +683,12 @@ class Database:
 
         def investigate_result(self, player: str, database: 'Database') -> str:
             result = "Player not found"
-            for name, role in database.players_list:
-                if name.lower() == player.lower():
-                    if role.lower() == 'mafia':
-                        result = f"{player.title()} is a Mafia."
-                    else:
-                        result = f"{player.title()} is not a Mafia."
-                    break  # stop once found
-            messagebox.showinfo(
-                "Sheriff Investigation",
-                f"Investigated {player.title()}: {result}\nCopy Sheriff prompt to clipboard."
-            )
+            role = database.role_of(player)
+            if role is not None:
+                if role.lower() == 'mafia':
+                    result = f"{player.title()} is a Mafia."
+                else:
+                    result = f"{player.title()} is not a Mafia."
             return result
 
             
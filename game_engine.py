@@ -0,0 +1,373 @@
+"""
+game_engine.py - Game rules (setup, night and day resolution, win check) without any UI
+"""
+import base64
+import functools
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, Optional
+from database import Database
+from history import History
+from journal import EventJournal, EventType
+from notifications import CHECKPOINT, StateBus
+from snapshot import GameState, encode, restore
+
+
+# Winner -> reason shown when the game ends
+WIN_REASONS = {
+    "Mafia": "Mafias have gained the majority!",
+    "Town": "All Mafias have been eliminated",
+}
+
+
+@dataclass
+class Resolution:
+    """Outcome of resolving a night or day vote"""
+    eliminated: Optional[str]       # Name of the eliminated player, None if nobody died
+    reason: str                     # Why (or why not) someone was eliminated
+    winner: Optional[str] = None    # "Mafia" or "Town" once the game has ended
+
+    @property
+    def win_reason(self) -> str:
+        """Reason the winner won, empty while the game goes on"""
+        return WIN_REASONS.get(self.winner or "", "")
+
+    @property
+    def game_over(self) -> bool:
+        return self.winner is not None
+
+
+def action(method: Callable) -> Callable:
+    """Make an engine method one undo step (nested actions join the outer one)"""
+    @functools.wraps(method)
+    def wrapper(self: 'GameEngine', *args, **kwargs):
+        self._action_depth += 1
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._action_depth -= 1
+            if not self._action_depth:
+                if self.history is not None:
+                    self.history.record(self)
+                self._flush_checkpoint()
+    return wrapper
+
+
+class GameEngine:
+    """
+    Owns the game state and applies every rule of the game
+
+    Windows call these methods instead of editing the Database and
+    Night_Day_Helper themselves, so a whole game can also be played from a
+    script without a display.
+    """
+
+    def __init__(self, db: Optional[Database] = None, journal: Optional[EventJournal] = None,
+                 undoable: bool = True):
+        self.db = db if db is not None else Database()
+        self.helper = self.db.Night_Day_Helper()
+        self.bus = StateBus()  # Every state change is published here
+        if journal is not None:
+            journal.attach(self.bus)
+        self.history: Optional[History] = History() if undoable else None  # None for faster scripted games
+        self._action_depth = 0
+        self._checkpoint_pending = False  # A checkpoint was reached inside an action or batch
+        self._reset_history()
+
+    def reset(self) -> None:
+        """Start over with a fresh game"""
+        self.db.reset_values()
+        self.helper = self.db.Night_Day_Helper()
+        self._reset_history()
+        self._emit(EventType.RESET)
+        self._checkpoint()
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Group the actions taken inside the block into one undo step"""
+        self.begin_batch()
+        try:
+            yield
+        finally:
+            self.end_batch()
+
+    def begin_batch(self) -> None:
+        """Start grouping actions into one undo step (see batch)"""
+        if not self._action_depth:
+            self._emit(EventType.BATCH_BEGIN)  # So a replay groups the same actions
+        self._action_depth += 1
+
+    def end_batch(self) -> None:
+        """Finish the undo step started by the matching begin_batch"""
+        self._action_depth -= 1
+        if not self._action_depth:
+            if self.history is not None:
+                self.history.record(self)
+            self._emit(EventType.BATCH_END)
+            self._flush_checkpoint()
+
+    def undo(self) -> bool:
+        """Take back the last action; returns False if there is nothing to undo"""
+        if self.history is None or not self.history.undo(self):
+            return False
+        self._emit(EventType.UNDO)
+        self._checkpoint()
+        return True
+
+    def redo(self) -> bool:
+        """Repeat the last undone action; returns False if there is nothing to redo"""
+        if self.history is None or not self.history.redo(self):
+            return False
+        self._emit(EventType.REDO)
+        self._checkpoint()
+        return True
+
+    def load_state(self, state: GameState, path: Optional[str] = None) -> None:
+        """
+        Replace the game with a saved state (e.g. read from a snapshot file)
+
+        The state itself is journaled, since the file it came from is
+        overwritten by later autosaves.
+
+        Args:
+            state: Captured game to continue from
+            path: Snapshot file the state was read from, if any
+        """
+        restore(self, state)
+        self._reset_history()  # Undo can't go back past a load
+        self._emit(EventType.RESTORED, path=path, state=base64.b64encode(encode(state)).decode("ascii"))
+        self._checkpoint()
+
+    # ----- Setup -----
+
+    @action
+    def set_player_count(self, total_players: int) -> None:
+        """Set the number of players, clearing any names and roles"""
+        self.db.change_player_num(total_players)
+        self._emit(EventType.PLAYER_COUNT, total_players=total_players)
+
+    @action
+    def set_mafia_count(self, total_mafias: int) -> None:
+        """Set the number of mafias"""
+        self.db.change_mafia_num(total_mafias)
+        self._emit(EventType.MAFIA_COUNT, total_mafias=total_mafias)
+
+    @action
+    def assign(self, position: int, name: str, role: str) -> None:
+        """
+        Set the name and role of the player at position (1-based)
+
+        Raises:
+            ValueError: If position is invalid or role assignment violates constraints
+        """
+        self.db.change_players_list(name, role, position)
+        self._emit(EventType.ROLE_ASSIGNED, position=position, name=name, role=role)
+
+    @action
+    def rename(self, position: int, name: str) -> None:
+        """Set the name of the player at position (1-based)"""
+        self.db.change_player_name(name, position)
+        self._emit(EventType.RENAMED, position=position, name=name)
+
+    def roster_complete(self) -> bool:
+        """Check whether every player has a name and a role"""
+        return all(name and role for name, role in self.db.players_list)
+
+    def lock_roles(self) -> None:
+        """
+        Lock names and roles so the game can start
+
+        Raises:
+            ValueError: If some names or roles are missing
+        """
+        if not self.roster_complete():
+            raise ValueError("Some 'Names' and/or 'Roles' are missing!!")
+        if not self.db.first_disable:
+            self.db.change_first_disable()
+            self._reset_history()  # Setup can't be undone once the game has started
+            self._emit(EventType.ROLES_LOCKED)
+            self._checkpoint()
+
+    # ----- Phases -----
+
+    @action
+    def set_phase(self, phase: str, number: int) -> None:
+        """
+        Switch between the phases of the current night or day
+
+        Args:
+            phase: "night" or "day"
+            number: Phase number within it (1 = discussion, 2 = voting)
+        """
+        if phase == "night":
+            self.helper.night_phase = number
+        else:
+            self.helper.day_phase = number
+        self._emit(EventType.PHASE, phase=phase, number=number)
+        self._checkpoint()
+
+    @action
+    def clear(self, what: str) -> None:
+        """Drop the recorded "votes" or "dialogues" """
+        if what == "votes":
+            self.helper.clear_votes()
+        else:
+            self.helper.clear_dialogues()
+        self._emit(EventType.CLEARED, what=what)
+
+    # ----- Night -----
+
+    @action
+    def night_dialogue(self, speaker: str, dialogue: str) -> None:
+        """Record what a mafia said during the night"""
+        self.helper.add_dialogue(speaker, dialogue)
+        self._emit(EventType.DIALOGUE, phase="night", speaker=speaker, dialogue=dialogue)
+
+    @action
+    def night_vote(self, voter: str, target: str) -> None:
+        """Record (or change) a mafia's vote for who to eliminate"""
+        self.helper.add_vote(target, voter=voter)
+        self._emit(EventType.VOTE, phase="night", voter=voter, target=target)
+
+    @action
+    def doctor_save(self, target: str) -> None:
+        """Record who the doctor protects tonight"""
+        self.helper.set_doctor_save(target)
+        self._emit(EventType.DOCTOR_SAVE, target=target)
+
+    def investigate(self, target: str) -> str:
+        """Get the sheriff's investigation result for target"""
+        result = self.helper.investigate_result(target, self.db)
+        self._emit(EventType.INVESTIGATION, target=target, result=result)
+        return result
+
+    @action
+    def resolve_night(self) -> Resolution:
+        """Eliminate the mafia's target unless the doctor saved them"""
+        self._emit(EventType.RESOLVED, phase="night")
+        target, reason = self.helper.most_voted()
+        if target is None:
+            self.helper.change_day_message("No one")
+            return Resolution(None, reason)
+
+        if not self.helper.check_died(target):
+            target, reason = None, f"The doctor saved {target.title()}."
+        elif not self._eliminate(target, reason):
+            target, reason = None, f"{target.title()} is not in the game."
+        else:
+            winner = self.winner()
+            if winner:
+                self._checkpoint()
+                return Resolution(target, reason, winner)
+
+        self.helper.change_day_message(target or "No one")
+        self.helper.clear_dialogues()
+        self.helper.clear_votes()
+        self._checkpoint()
+        return Resolution(target, reason)
+
+    @action
+    def end_night(self) -> None:
+        """Move from the night to the following day"""
+        self.helper.increment_night()
+        self.helper.clear_votes()
+        self.helper.clear_dialogues()
+        self._emit(EventType.PHASE_ADVANCE, to="day")
+        self._checkpoint()
+
+    # ----- Day -----
+
+    @action
+    def day_dialogue(self, speaker: str, dialogue: str) -> None:
+        """Record what a player said during the day"""
+        self.helper.add_dialogue(speaker, dialogue)
+        self._emit(EventType.DIALOGUE, phase="day", speaker=speaker, dialogue=dialogue)
+
+    @action
+    def day_vote(self, voter: str, target: str) -> None:
+        """Record (or change) a player's vote for who to eliminate"""
+        self.helper.add_vote(target, voter=voter)
+        self._emit(EventType.VOTE, phase="day", voter=voter, target=target)
+
+    @action
+    def resolve_day(self) -> Resolution:
+        """Eliminate the player with the most day votes"""
+        self._emit(EventType.RESOLVED, phase="day")
+        target, reason = self.helper.most_voted(apply_doctor_save=False)
+        if target and not self._eliminate(target, reason):
+            target, reason = None, f"{target.title()} is not in the game."
+        self.helper.clear_votes()
+        self.helper.clear_dialogues()
+        self._checkpoint()
+        return Resolution(target, reason, self.winner())
+
+    @action
+    def end_day(self) -> None:
+        """Move from the day to the following night"""
+        self.helper.clear_votes()
+        self.helper.clear_dialogues()
+        self.helper.reset_night_state()  # The day's elimination must not block the night's
+        self.helper.day_number += 1
+        self._emit(EventType.PHASE_ADVANCE, to="night")
+        self._checkpoint()
+
+    # ----- Results -----
+
+    def winner(self) -> Optional[str]:
+        """Get "Mafia" or "Town" if the game has been won, else None"""
+        win_dict = self.db.check_win()
+        if win_dict["mafia_win"]:
+            return "Mafia"
+        if win_dict["town_win"]:
+            return "Town"
+        return None
+
+    def tally(self) -> Dict[str, int]:
+        """Current vote count per player"""
+        return dict(self.helper.votes)
+
+    def _emit(self, event_type: EventType, **data) -> None:
+        """Publish a state change"""
+        self.bus.publish(event_type, **data)
+
+    def _reset_history(self) -> None:
+        """Make the current state the oldest undo step"""
+        if self.history is not None:
+            self.history.reset(self)
+
+    def _checkpoint(self) -> None:
+        """
+        Publish that the game reached a phase boundary
+
+        Inside an action or batch this waits until the outermost one is
+        finished, so autosaves never capture a half-applied step.
+        """
+        if self._action_depth:
+            self._checkpoint_pending = True
+        else:
+            self.bus.publish(CHECKPOINT)
+
+    def _flush_checkpoint(self) -> None:
+        """Publish a checkpoint deferred by _checkpoint"""
+        if self._checkpoint_pending:
+            self._checkpoint_pending = False
+            self.bus.publish(CHECKPOINT)
+
+    def _eliminate(self, target: str, reason: str) -> bool:
+        """
+        Eliminate target and credit the votes that decided it
+
+        Returns:
+            False if target is not a player still in the game (nothing is recorded then)
+        """
+        if not self.db.eliminate_player(target):
+            print(f"Cannot eliminate {target!r}: no such player in the game")
+            return False
+        for voter, votee in self.helper.vote_ledger.ballots.items():
+            voter_record = self.db.player(voter)
+            if voter_record is not None:
+                voter_record.record("votes_cast")
+            votee_record = self.db.player(votee)
+            if votee_record is not None:
+                votee_record.record("votes_received")
+        self._emit(EventType.ELIMINATION, player=target, reason=reason)
@@ -0,0 +1,125 @@
+"""
+history.py - Undo/redo of mediator actions over structurally shared game states
+"""
+from typing import List, Optional, Tuple
+from database import Player
+from snapshot import GameState, restore
+
+# Version stamps of the roster, dialogues and ballots a state was captured at
+Versions = Tuple[int, int, int]
+Seat = Tuple[str, object, bool, Tuple[Tuple[str, int], ...]]
+
+
+class History:
+    """
+    Undo and redo stacks of immutable game states
+
+    Consecutive states share every part that didn't change: the roster,
+    dialogues and ballots are reused by reference while their version stamp is
+    unchanged, and within a changed roster each unchanged seat is reused. A
+    step that changes the dialogues or ballots does copy that part's pairs,
+    at most one per player, but the strings in them are shared; a one-line
+    change therefore costs a tuple of references, not a copy of the text.
+    """
+    LIMIT = 200  # Undo steps kept
+
+    def __init__(self) -> None:
+        self._undo: List[Tuple[Versions, GameState]] = []  # last entry is the current state
+        self._redo: List[Tuple[Versions, GameState]] = []
+
+    def reset(self, engine) -> None:
+        """Forget all steps and make the engine's state the oldest one"""
+        self._undo = [self._capture(engine, None)]
+        self._redo = []
+
+    def record(self, engine) -> None:
+        """Add the engine's state as a new step, unless nothing changed"""
+        previous = self._undo[-1] if self._undo else None
+        entry = self._capture(engine, previous)
+        if previous is not None and entry[1] == previous[1]:
+            return
+        self._undo.append(entry)
+        self._redo = []
+        if len(self._undo) > self.LIMIT:
+            del self._undo[0]
+
+    def can_undo(self) -> bool:
+        return len(self._undo) > 1
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def undo(self, engine) -> bool:
+        """Restore the state before the last step; returns False if there is none"""
+        if not self.can_undo():
+            return False
+        self._redo.append(self._undo.pop())
+        self._restore(engine, self._undo[-1])
+        return True
+
+    def redo(self, engine) -> bool:
+        """Restore the last undone step; returns False if there is none"""
+        if not self.can_redo():
+            return False
+        entry = self._redo.pop()
+        self._undo.append(entry)
+        self._restore(engine, entry)
+        return True
+
+    def _restore(self, engine, entry: Tuple[Versions, GameState]) -> None:
+        """Put the engine back into a recorded state"""
+        restore(engine, entry[1])
+        # The restored parts are the recorded ones, so the next step can share them
+        self._undo[-1] = (self._versions(engine), entry[1])
+
+    @staticmethod
+    def _versions(engine) -> Versions:
+        return engine.db.version, engine.helper.dialogues_version, engine.helper.vote_ledger.version
+
+    def _capture(self, engine, previous: Optional[Tuple[Versions, GameState]]) -> Tuple[Versions, GameState]:
+        """Capture the engine's state, sharing unchanged parts with previous"""
+        db, helper, ledger = engine.db, engine.helper, engine.helper.vote_ledger
+        versions = self._versions(engine)
+        prev_versions, prev = previous if previous is not None else ((0, 0, 0), None)
+
+        if prev is not None and versions[0] == prev_versions[0]:
+            seats, eliminated = prev.seats, prev.eliminated_seats
+        else:
+            prev_seats = prev.seats if prev is not None else ()
+            seats = tuple(
+                _seat(player, prev_seats[player.seat] if player.seat < len(prev_seats) else None)
+                for player in db.roster
+            )
+            eliminated = db.eliminated_seats
+        dialogues = (prev.dialogues if prev is not None and versions[1] == prev_versions[1]
+                     else tuple(helper.dialogues.items()))
+        ballots = (prev.ballots if prev is not None and versions[2] == prev_versions[2]
+                   else tuple(ledger.ballots.items()))
+
+        state = GameState(
+            total_players=db.total_players,
+            total_mafias=db.total_mafias,
+            first_disable=db.first_disable,
+            seats=seats,
+            eliminated_seats=eliminated,
+            night_number=helper.night_number,
+            day_number=helper.day_number,
+            night_phase=helper.night_phase,
+            day_phase=helper.day_phase,
+            anonymous_votes=ledger.anonymous_count,
+            doctor_save=helper.doctor_save,
+            eliminated_this_night=helper.eliminated_this_night,
+            day_message=helper.day_message,
+            dialogues=dialogues,
+            ballots=ballots,
+        )
+        return versions, state
+
+
+def _seat(player: Player, previous: Optional[Seat]) -> Seat:
+    """Immutable record of one seat, reusing previous if it is unchanged"""
+    stats = tuple(player.stats.items()) if player.stats else ()
+    if (previous is not None and previous[0] == player.name and previous[1] is player.role
+            and previous[2] == player.alive and previous[3] == stats):
+        return previous
+    return (player.name, player.role, player.alive, stats)
@@ -0,0 +1,224 @@
+"""
+journal.py - Append-only record of every game event, replayable into a fresh GameEngine
+"""
+import base64
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import IO, Any, Dict, Iterable, List, Optional
+
+JOURNAL_DIR = "saves"
+JOURNAL_EXTENSION = ".jsonl"
+
+
+class EventType(str, Enum):
+    """Kinds of state change recorded in the journal"""
+    PLAYER_COUNT = "player_count"    # {"total_players"}
+    MAFIA_COUNT = "mafia_count"      # {"total_mafias"}
+    ROLE_ASSIGNED = "role_assigned"  # {"position", "name", "role"}
+    RENAMED = "renamed"              # {"position", "name"}
+    ROLES_LOCKED = "roles_locked"    # {}
+    DIALOGUE = "dialogue"            # {"phase", "speaker", "dialogue"}
+    VOTE = "vote"                    # {"phase", "voter", "target"}
+    DOCTOR_SAVE = "doctor_save"      # {"target"}
+    INVESTIGATION = "investigation"  # {"target", "result"}, audit only
+    CLEARED = "cleared"              # {"what": "votes" | "dialogues"}
+    PHASE = "phase"                  # {"phase", "number"}
+    RESOLVED = "resolved"            # {"phase"}
+    ELIMINATION = "elimination"      # {"player", "reason"}, re-derived and checked on replay
+    PHASE_ADVANCE = "phase_advance"  # {"to": "day" | "night"}
+    RESET = "reset"                  # {}
+    UNDO = "undo"                    # {}
+    REDO = "redo"                    # {}
+    BATCH_BEGIN = "batch_begin"      # {}, the following actions up to BATCH_END are one undo step
+    BATCH_END = "batch_end"          # {}
+    RESTORED = "restored"            # {"path", "state"}: the loaded snapshot, base64-encoded
+
+
+@dataclass(frozen=True)
+class Event:
+    """One journal entry"""
+    seq: int
+    type: EventType
+    data: Dict[str, Any] = field(default_factory=dict)
+    time: float = 0.0
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {"seq": self.seq, "type": self.type.value, "data": self.data, "time": self.time},
+            separators=(",", ":")
+        )
+
+    @classmethod
+    def from_json(cls, line: str) -> 'Event':
+        raw = json.loads(line)
+        return cls(raw["seq"], EventType(raw["type"]), raw.get("data", {}), raw.get("time", 0.0))
+
+
+class EventJournal:
+    """
+    Append-only JSON-lines journal of one game
+
+    Every event is handed to the OS as soon as it is appended, so it survives
+    the app crashing. fsync, which is what makes it survive the machine going
+    down, is batched: it runs every FSYNC_EVERY events and whenever the game
+    moves to the next night or day. The file is only created once the first
+    event arrives.
+    """
+    FSYNC_EVERY = 32
+    SYNC_ON = {EventType.PHASE_ADVANCE, EventType.ROLES_LOCKED, EventType.RESET}
+
+    def __init__(self, path: str):
+        self.path = path
+        self.events: List[Event] = []
+        self._file: Optional[IO[str]] = None
+        self._unsynced = 0
+
+    def attach(self, bus) -> None:
+        """Record every game event published on a StateBus"""
+        from notifications import ANY
+        bus.subscribe(ANY, self._on_event)
+
+    def _on_event(self, topic: str, data: Dict[str, Any]) -> None:
+        """StateBus subscriber appending game events (other topics are ignored)"""
+        if isinstance(topic, EventType):
+            self.append(topic, **data)
+
+    def append(self, event_type: EventType, **data: Any) -> Event:
+        """Record an event"""
+        event = Event(len(self.events) + 1, event_type, data, time.time())
+        self.events.append(event)
+        try:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(event.to_json() + "\n")
+            self._file.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.FSYNC_EVERY or event_type in self.SYNC_ON:
+                self.sync()
+        except OSError as e:
+            print(f"Error writing journal {self.path}: {e}")
+        return event
+
+    def sync(self) -> None:
+        """Force appended events to disk"""
+        if self._file is None or not self._unsynced:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self) -> None:
+        """Sync and close the journal file"""
+        if self._file is None:
+            return
+        try:
+            self.sync()
+        finally:
+            self._file.close()
+            self._file = None
+
+
+def load(path: str) -> List[Event]:
+    """
+    Read the events of a journal file
+
+    A partly written last line (the app died mid-write) is ignored.
+    """
+    events = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                events.append(Event.from_json(line))
+            except (ValueError, KeyError):
+                break
+    return events
+
+
+def replay(events: Iterable[Event], engine=None):
+    """
+    Rebuild a game by re-applying its events to a fresh GameEngine
+
+    Args:
+        events: Events in journal order
+        engine: Engine to replay into (a new one if None); it must not have a journal
+
+    Raises:
+        ValueError: If an elimination in the journal doesn't happen on replay
+    """
+    if engine is None:
+        from game_engine import GameEngine
+        engine = GameEngine()
+
+    for event in events:
+        apply_event(engine, event)
+    while engine._action_depth:  # The journal ended inside a batch
+        engine.end_batch()
+    return engine
+
+
+def apply_event(engine, event: Event) -> None:
+    """Re-apply one event to engine"""
+    data = event.data
+    kind = event.type
+    if kind is EventType.PLAYER_COUNT:
+        engine.set_player_count(data["total_players"])
+    elif kind is EventType.MAFIA_COUNT:
+        engine.set_mafia_count(data["total_mafias"])
+    elif kind is EventType.ROLE_ASSIGNED:
+        engine.assign(data["position"], data["name"], data["role"])
+    elif kind is EventType.RENAMED:
+        engine.rename(data["position"], data["name"])
+    elif kind is EventType.ROLES_LOCKED:
+        engine.lock_roles()
+    elif kind is EventType.DIALOGUE:
+        if data["phase"] == "night":
+            engine.night_dialogue(data["speaker"], data["dialogue"])
+        else:
+            engine.day_dialogue(data["speaker"], data["dialogue"])
+    elif kind is EventType.VOTE:
+        if data["phase"] == "night":
+            engine.night_vote(data["voter"], data["target"])
+        else:
+            engine.day_vote(data["voter"], data["target"])
+    elif kind is EventType.DOCTOR_SAVE:
+        engine.doctor_save(data["target"])
+    elif kind is EventType.CLEARED:
+        engine.clear(data["what"])
+    elif kind is EventType.PHASE:
+        engine.set_phase(data["phase"], data["number"])
+    elif kind is EventType.RESOLVED:
+        if data["phase"] == "night":
+            engine.resolve_night()
+        else:
+            engine.resolve_day()
+    elif kind is EventType.PHASE_ADVANCE:
+        if data["to"] == "day":
+            engine.end_night()
+        else:
+            engine.end_day()
+    elif kind is EventType.RESET:
+        engine.reset()
+    elif kind is EventType.UNDO:
+        engine.undo()
+    elif kind is EventType.REDO:
+        engine.redo()
+    elif kind is EventType.BATCH_BEGIN:
+        engine.begin_batch()
+    elif kind is EventType.BATCH_END:
+        engine.end_batch()
+    elif kind is EventType.RESTORED:
+        from snapshot import decode
+        engine.load_state(decode(base64.b64decode(data["state"])), data.get("path"))
+    elif kind is EventType.ELIMINATION:
+        if not engine.db.is_eliminated(data["player"]):
+            raise ValueError(f"Replay diverged at event {event.seq}: {data['player']} was not eliminated")
+
+
+def journal_path(session_id: str, directory: str = JOURNAL_DIR) -> str:
+    """Journal file for a game started now by this process"""
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{session_id}{JOURNAL_EXTENSION}"
+    return os.path.join(directory, name)
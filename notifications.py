@@ -0,0 +1,58 @@
+"""
+notifications.py - Publish/subscribe of game state changes for targeted UI refresh
+"""
+from typing import TYPE_CHECKING, Any, Callable, Dict, List
+
+if TYPE_CHECKING:  # No tkinter at runtime: the game engine must run without a display
+    import tkinter as tk
+
+# Topics besides the journal's EventType values
+ANY = "*"                 # Every topic
+CHECKPOINT = "checkpoint" # The game reached a phase boundary (e.g. time to autosave)
+
+Subscriber = Callable[[str, Dict[str, Any]], None]  # (topic, data)
+
+
+class StateBus:
+    """
+    Delivers each state change only to the subscribers of its topic
+
+    Topics are the journal's EventType values (player eliminated, role
+    assigned, vote cast, ...) plus CHECKPOINT; subscribing to ANY receives
+    everything. A failing subscriber is reported and skipped so it can't
+    stop the others or the game.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: Dict[str, List[Subscriber]] = {}
+
+    def subscribe(self, topic: str, callback: Subscriber) -> Callable[[], None]:
+        """Call callback for every change on topic; returns a function that unsubscribes"""
+        self._subscribers.setdefault(topic, []).append(callback)
+        return lambda: self.unsubscribe(topic, callback)
+
+    def unsubscribe(self, topic: str, callback: Subscriber) -> None:
+        """Stop calling callback for topic"""
+        callbacks = self._subscribers.get(topic)
+        if callbacks and callback in callbacks:
+            callbacks.remove(callback)
+
+    def subscribe_widget(self, widget: 'tk.Misc', topic: str, callback: Subscriber) -> None:
+        """Subscribe for as long as widget exists"""
+        import tkinter as tk
+        unsubscribe = self.subscribe(topic, callback)
+
+        def on_destroy(event: 'tk.Event') -> None:
+            if event.widget is widget:
+                unsubscribe()
+
+        # tk.Misc.bind directly: customtkinter widgets redirect bind() to their inner parts
+        tk.Misc.bind(widget, "<Destroy>", on_destroy, "+")
+
+    def publish(self, topic: str, **data: Any) -> None:
+        """Notify the subscribers of topic and of ANY"""
+        for callback in (*self._subscribers.get(topic, ()), *self._subscribers.get(ANY, ())):
+            try:
+                callback(topic, data)
+            except Exception as e:
+                print(f"Error in {topic} subscriber {callback!r}: {e}")
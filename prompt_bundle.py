@@ -0,0 +1,126 @@
+"""
+prompt_bundle.py - Export of every pending prompt of a phase to one file
+"""
+import json
+import os
+import re
+import zipfile
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional
+from windows.prompts.templates import render_day_prompt, render_initial_prompts, render_night_prompt
+
+if TYPE_CHECKING:
+    from game_engine import GameEngine
+
+PHASES = ("initial", "night", "day")
+BUNDLE_FILETYPES = [("JSON Lines", "*.jsonl"), ("Zip archive", "*.zip")]
+MANIFEST_NAME = "manifest.jsonl"  # Prompt-less index of the records in a zip bundle
+
+
+def phase_prompts(engine: 'GameEngine', phase: str,
+                  overrides: Optional[Dict[str, str]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Render the prompt of every living player for a phase, one record at a time
+
+    Args:
+        engine: Game to render the prompts of
+        phase: "initial" (role prompts), "night" or "day"
+        overrides: Prompt to send instead, per role (e.g. the Sheriff's investigation result)
+
+    Returns:
+        Records with the player, role, speaking position, phase, its number and step, and the prompt
+
+    Raises:
+        ValueError: If phase is not one of PHASES
+    """
+    if phase not in PHASES:
+        raise ValueError(f"Unknown phase {phase!r}")
+    db, helper = engine.db, engine.helper
+    players = dict(db.players_list)
+    overrides = overrides or {}
+
+    if phase == "initial":
+        number, step = None, None
+        prompts = render_initial_prompts(players, db.total_players, db.total_mafias, db.mafias_list)
+    elif phase == "night":
+        number, step = helper.night_number, helper.night_phase
+        by_role: Dict[str, str] = {}  # Everyone with a role gets the same night prompt
+        for role in set(players.values()):
+            dialogues = helper.get_dialogues() if role == "mafia" else ""
+            by_role[role] = render_night_prompt(role, number, step, dialogues)
+        prompts = ((name, by_role[role]) for name, role in players.items())
+    else:
+        number, step = helper.day_number, helper.day_phase
+        prompt = render_day_prompt(number, step, helper.get_dialogues())
+        prompts = ((name, prompt) for name in players)
+
+    for position, (name, prompt) in enumerate(prompts, start=1):
+        role = players[name]
+        yield {
+            "player": name,
+            "role": role,
+            "position": position,
+            "phase": phase,
+            "number": number,
+            "step": step,
+            "prompt": overrides.get(role, prompt),
+        }
+
+
+def export(engine: 'GameEngine', path: str, phase: str,
+           overrides: Optional[Dict[str, str]] = None) -> int:
+    """
+    Write every pending prompt of a phase to a JSON-lines or zip bundle
+
+    Prompts are rendered and written one at a time, so the bundle is never
+    held in memory. A zip holds one text file per player plus MANIFEST_NAME.
+    The file only replaces path once it is complete.
+
+    Args:
+        engine: Game to export the prompts of
+        path: Bundle file; its extension (.jsonl or .zip) picks the format
+        phase: "initial", "night" or "day"
+        overrides: Prompt to send instead, per role
+
+    Returns:
+        Number of prompts written
+
+    Raises:
+        ValueError: If the extension or the phase is not supported
+        OSError: If the file can't be written
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in (".jsonl", ".zip"):
+        raise ValueError(f"Unsupported bundle type {extension or path!r}; use .jsonl or .zip")
+    records = phase_prompts(engine, phase, overrides)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    count = 0
+    try:
+        if extension == ".jsonl":
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    count += 1
+        else:
+            with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as bundle:
+                manifest = []
+                for record in records:
+                    prompt = record.pop("prompt")
+                    record["file"] = _entry_name(record)
+                    bundle.writestr(record["file"], prompt)
+                    manifest.append(json.dumps(record, ensure_ascii=False))
+                    count += 1
+                bundle.writestr(MANIFEST_NAME, "\n".join(manifest) + "\n")
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
+
+
+def _entry_name(record: Dict[str, Any]) -> str:
+    """File name of a record's prompt inside a zip bundle"""
+    player = re.sub(r"[^\w.-]+", "_", record["player"]) or "player"
+    return f"{record['position']:02d}-{player}-{record['role']}.txt"
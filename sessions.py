@@ -0,0 +1,191 @@
+"""
+sessions.py - Several independent games held at once, one of them selected
+"""
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from game_engine import GameEngine
+from journal import EventJournal, JOURNAL_DIR, JOURNAL_EXTENSION, journal_path
+from notifications import CHECKPOINT
+from snapshot import Autosaver, SNAPSHOT_EXTENSION, latest_snapshot, load
+
+
+@dataclass
+class GameSession:
+    """One game table with its own engine (Database and Night_Day_Helper)"""
+    id: str
+    name: str
+    engine: GameEngine = field(default_factory=GameEngine)
+    journal: Optional[EventJournal] = None
+    snapshot_path: Optional[str] = None  # Autosave file, None when not saved to disk
+
+
+class SessionManager:
+    """
+    Holds games keyed by id and tracks which one the UI is bound to
+
+    There is always at least one game and exactly one selected game.
+    Closing a game deletes its journal and snapshot; prune_saves() keeps
+    only the KEEP_SAVES newest games left over from earlier runs.
+    """
+    KEEP_SAVES = 10  # Games (journal and snapshot) kept in journal_dir from earlier runs
+
+    def __init__(self, journal_dir: Optional[str] = JOURNAL_DIR) -> None:
+        self.journal_dir = journal_dir  # None keeps games in memory only
+        self.autosaver = Autosaver()
+        self._sessions: Dict[str, GameSession] = {}
+        self._next_number: int = 1
+        self.current_id: str = ""
+        self.new()
+
+    @property
+    def current(self) -> GameSession:
+        """The selected game"""
+        return self._sessions[self.current_id]
+
+    def new(self, name: Optional[str] = None, select: bool = True) -> GameSession:
+        """Start a new game, selecting it unless select is False"""
+        session_id = f"game-{self._next_number}"
+        self._next_number += 1
+        session = GameSession(session_id, name or f"Game {session_id.split('-')[1]}")
+        if self.journal_dir is not None:
+            path = journal_path(session_id, self.journal_dir)
+            session.journal = EventJournal(path)
+            session.journal.attach(session.engine.bus)
+            session.snapshot_path = os.path.splitext(path)[0] + SNAPSHOT_EXTENSION
+            session.engine.bus.subscribe(CHECKPOINT, lambda topic, data: self._autosave(session))
+        self._sessions[session_id] = session
+        if select or not self.current_id:
+            self.current_id = session_id
+        return session
+
+    def select(self, session_id: str) -> GameSession:
+        """
+        Bind the UI to another game
+
+        Raises:
+            KeyError: If there is no game with that id
+        """
+        if session_id not in self._sessions:
+            raise KeyError(f"No game with id {session_id!r}")
+        self.current_id = session_id
+        return self.current
+
+    def close(self, session_id: str) -> None:
+        """Discard a game and its saves; closing the last one starts a fresh game"""
+        session = self._sessions.pop(session_id, None)
+        if session is not None and session.journal is not None:
+            session.journal.close()
+            self._delete_save(session.journal.path)
+        if session is not None and session.snapshot_path is not None:
+            self.autosaver.discard(session.snapshot_path)  # So no autosave writes it again
+            self._delete_save(session.snapshot_path)
+        if not self._sessions:
+            self.current_id = ""
+            self.new()
+        elif session_id == self.current_id:
+            self.current_id = next(reversed(self._sessions))
+
+    def get(self, session_id: str) -> Optional[GameSession]:
+        """Get a game by id, or None"""
+        return self._sessions.get(session_id)
+
+    def find_by_name(self, name: str) -> Optional[GameSession]:
+        """Get a game by its display name, or None"""
+        return next((s for s in self._sessions.values() if s.name == name), None)
+
+    def sessions(self) -> List[GameSession]:
+        """Every game, oldest first"""
+        return list(self._sessions.values())
+
+    def latest_save(self) -> Optional[str]:
+        """Snapshot left by the most recent unfinished game, or None"""
+        if self.journal_dir is None:
+            return None
+        path = latest_snapshot(self.journal_dir)
+        in_use = {session.snapshot_path for session in self._sessions.values()}
+        return None if path in in_use else path
+
+    def prune_saves(self) -> List[str]:
+        """
+        Delete the saves of all but the KEEP_SAVES most recently saved games
+
+        A game's journal and snapshot share a name and are kept or deleted
+        together. Saves of open games are never deleted. Called once at app
+        start rather than on import, so tools importing utils leave saves alone.
+
+        Returns:
+            Paths of the deleted files
+        """
+        if self.journal_dir is None:
+            return []
+        games: Dict[str, List[str]] = {}  # path without extension -> its save files
+        try:
+            for name in os.listdir(self.journal_dir):
+                stem, extension = os.path.splitext(os.path.join(self.journal_dir, name))
+                if extension in (JOURNAL_EXTENSION, SNAPSHOT_EXTENSION):
+                    games.setdefault(stem, []).append(stem + extension)
+            newest_first = sorted(games, key=lambda stem: max(map(os.path.getmtime, games[stem])), reverse=True)
+        except OSError as e:
+            print(f"Error listing saves in {self.journal_dir}: {e}")
+            return []
+
+        in_use = set()
+        for session in self._sessions.values():
+            for path in (session.snapshot_path, session.journal and session.journal.path):
+                if path:
+                    in_use.add(os.path.splitext(path)[0])
+        deleted = []
+        for stem in newest_first[self.KEEP_SAVES:]:
+            if stem in in_use:
+                continue
+            for path in games[stem]:
+                if self._delete_save(path):
+                    deleted.append(path)
+        return deleted
+
+    def restore(self, path: str) -> GameSession:
+        """
+        Load a snapshot into the selected game, which keeps autosaving to it
+
+        The loaded state is written to the game's journal (see GameEngine.load_state).
+
+        Raises:
+            OSError: If the file can't be read
+            ValueError: If the file is not a valid snapshot
+        """
+        session = self.current
+        previous_path, session.snapshot_path = session.snapshot_path, path  # The load's checkpoint autosaves here
+        try:
+            load(path, session.engine)
+        except (OSError, ValueError):
+            session.snapshot_path = previous_path
+            raise
+        return session
+
+    def shutdown(self) -> None:
+        """Flush every game's journal and autosave to disk before the app exits"""
+        self.autosaver.flush()
+        for session in self._sessions.values():
+            if session.journal is not None:
+                session.journal.close()
+
+    @staticmethod
+    def _delete_save(path: str) -> bool:
+        """Delete a journal or snapshot file; returns False if it couldn't be deleted"""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            print(f"Error deleting save {path}: {e}")
+            return False
+        return True
+
+    def _autosave(self, session: GameSession) -> None:
+        """Save a game in the background after it moved to a new phase"""
+        if session.snapshot_path is not None:
+            self.autosaver.request(session.engine, session.snapshot_path)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
@@ -0,0 +1,324 @@
+"""
+snapshot.py - Compact binary save files of a game, written in the background
+
+Layout (little-endian):
+    header   MAGIC, format version, CRC-32 and length of the body
+    body     setup (player and mafia counts, roles locked), one record per
+             seat, elimination order, then the night/day position, doctor
+             save, day message, dialogues and ballots
+Strings are stored as a uint32 byte length followed by UTF-8; a length of
+NONE_LENGTH stands for None.
+"""
+import os
+import struct
+import threading
+import zlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+from database import Player, Role
+
+if TYPE_CHECKING:
+    from game_engine import GameEngine
+
+MAGIC = b"MSNP"
+VERSION = 1
+SNAPSHOT_EXTENSION = ".snap"
+
+_HEADER = struct.Struct("<4sHII")    # magic, version, crc32, body length
+_SETUP = struct.Struct("<HH?H")      # total players, total mafias, roles locked, seats
+_SEAT = struct.Struct("<B?H")        # role, alive, number of stats
+_POSITION = struct.Struct("<HHBBI")  # night number, day number, night phase, day phase, anonymous votes
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_I32 = struct.Struct("<i")
+NONE_LENGTH = 0xFFFFFFFF
+
+_ROLES = list(Role)  # Role <-> code
+
+
+@dataclass(frozen=True)
+class GameState:
+    """Plain copy of everything needed to restore a game"""
+    total_players: int
+    total_mafias: int
+    first_disable: bool
+    seats: Tuple[Tuple[str, Role, bool, Tuple[Tuple[str, int], ...]], ...]  # name, role, alive, stats
+    eliminated_seats: Tuple[int, ...]
+    night_number: int
+    day_number: int
+    night_phase: int
+    day_phase: int
+    anonymous_votes: int
+    doctor_save: Optional[str]
+    eliminated_this_night: Optional[str]
+    day_message: str
+    dialogues: Tuple[Tuple[str, str], ...]
+    ballots: Tuple[Tuple[str, str], ...]
+
+
+def capture(engine: 'GameEngine') -> GameState:
+    """Copy the engine's state; cheap enough to do on the Tk thread"""
+    db, helper = engine.db, engine.helper
+    return GameState(
+        total_players=db.total_players,
+        total_mafias=db.total_mafias,
+        first_disable=db.first_disable,
+        seats=tuple(
+            (p.name, p.role, p.alive, tuple((p.stats or {}).items())) for p in db.roster
+        ),
+        eliminated_seats=db.eliminated_seats,
+        night_number=helper.night_number,
+        day_number=helper.day_number,
+        night_phase=helper.night_phase,
+        day_phase=helper.day_phase,
+        anonymous_votes=helper.vote_ledger.anonymous_count,
+        doctor_save=helper.doctor_save,
+        eliminated_this_night=helper.eliminated_this_night,
+        day_message=helper.day_message,
+        dialogues=tuple(helper.dialogues.items()),
+        ballots=tuple(helper.vote_ledger.ballots.items()),
+    )
+
+
+def restore(engine: 'GameEngine', state: GameState) -> None:
+    """
+    Replace the engine's game with a captured state
+
+    The engine keeps its Database, Night_Day_Helper and VoteLedger objects,
+    so windows holding them stay current and the ballot audit trail is kept.
+    """
+    db = engine.db
+    db.total_players = state.total_players
+    db.total_mafias = state.total_mafias
+    db.first_disable = state.first_disable
+    db.load_roster(
+        [Player(name, role, seat, alive, dict(stats) if stats else None)
+         for seat, (name, role, alive, stats) in enumerate(state.seats)],
+        list(state.eliminated_seats)
+    )
+
+    helper = engine.helper
+    helper.night_number = state.night_number
+    helper.day_number = state.day_number
+    helper.night_phase = state.night_phase
+    helper.day_phase = state.day_phase
+    helper.doctor_save = state.doctor_save
+    helper.eliminated_this_night = state.eliminated_this_night
+    helper.day_message = state.day_message
+    helper.transcript.load(state.dialogues)
+    helper.vote_ledger.load(state.ballots, state.anonymous_votes)
+
+
+def encode(state: GameState) -> bytes:
+    """Serialize a captured state to the snapshot format"""
+    out = bytearray()
+    out += _SETUP.pack(state.total_players, state.total_mafias, state.first_disable, len(state.seats))
+    for name, role, alive, stats in state.seats:
+        _pack_str(out, name)
+        out += _SEAT.pack(_ROLES.index(role), alive, len(stats))
+        for key, value in stats:
+            _pack_str(out, key)
+            out += _I32.pack(value)
+    out += _U16.pack(len(state.eliminated_seats))
+    for seat in state.eliminated_seats:
+        out += _U16.pack(seat)
+
+    out += _POSITION.pack(state.night_number, state.day_number, state.night_phase,
+                          state.day_phase, state.anonymous_votes)
+    _pack_str(out, state.doctor_save)
+    _pack_str(out, state.eliminated_this_night)
+    _pack_str(out, state.day_message)
+    for pairs in (state.dialogues, state.ballots):
+        out += _U32.pack(len(pairs))
+        for key, value in pairs:
+            _pack_str(out, key)
+            _pack_str(out, value)
+
+    return _HEADER.pack(MAGIC, VERSION, zlib.crc32(out), len(out)) + bytes(out)
+
+
+def decode(data: bytes) -> GameState:
+    """
+    Parse a snapshot
+
+    Raises:
+        ValueError: If data is not a valid snapshot of a supported version
+    """
+    if len(data) < _HEADER.size:
+        raise ValueError("Snapshot is truncated")
+    magic, version, crc, length = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a game snapshot")
+    if version != VERSION:
+        raise ValueError(f"Unsupported snapshot version {version}")
+    body = memoryview(data)[_HEADER.size:]
+    if len(body) != length or zlib.crc32(body) != crc:
+        raise ValueError("Snapshot is corrupted")
+
+    reader = _Reader(body)
+    total_players, total_mafias, first_disable, seat_count = reader.unpack(_SETUP)
+    seats = []
+    for _ in range(seat_count):
+        name = reader.string()
+        role_code, alive, stat_count = reader.unpack(_SEAT)
+        stats = tuple((reader.string(), reader.unpack(_I32)[0]) for _ in range(stat_count))
+        seats.append((name, _ROLES[role_code], alive, stats))
+    (eliminated_count,) = reader.unpack(_U16)
+    eliminated = tuple(reader.unpack(_U16)[0] for _ in range(eliminated_count))
+
+    night_number, day_number, night_phase, day_phase, anonymous = reader.unpack(_POSITION)
+    doctor_save = reader.string()
+    eliminated_this_night = reader.string()
+    day_message = reader.string() or ""
+    pairs = []
+    for _ in range(2):
+        (count,) = reader.unpack(_U32)
+        pairs.append(tuple((reader.string(), reader.string()) for _ in range(count)))
+
+    return GameState(
+        total_players, total_mafias, first_disable, tuple(seats), eliminated,
+        night_number, day_number, night_phase, day_phase, anonymous,
+        doctor_save, eliminated_this_night, day_message, pairs[0], pairs[1],
+    )
+
+
+def save(engine: 'GameEngine', path: str) -> None:
+    """Write the engine's game to path"""
+    write_atomic(path, encode(capture(engine)))
+
+
+def load(path: str, engine: Optional['GameEngine'] = None) -> 'GameEngine':
+    """
+    Read a snapshot into engine (a new engine if None); the load is journaled like any action
+
+    Raises:
+        OSError: If the file can't be read
+        ValueError: If the file is not a valid snapshot
+    """
+    with open(path, "rb") as f:
+        state = decode(f.read())
+    if engine is None:
+        from game_engine import GameEngine
+        engine = GameEngine()
+    engine.load_state(state, path)
+    return engine
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """Replace path with data so that a crash never leaves a half-written file"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def latest_snapshot(directory: str) -> Optional[str]:
+    """Path of the most recently written snapshot of a game in progress, or None"""
+    try:
+        names = [n for n in os.listdir(directory) if n.endswith(SNAPSHOT_EXTENSION)]
+    except OSError:
+        return None
+    for name in sorted(names, key=lambda n: os.path.getmtime(os.path.join(directory, n)), reverse=True):
+        path = os.path.join(directory, name)
+        try:
+            with open(path, "rb") as f:
+                if decode(f.read()).first_disable:
+                    return path
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+class Autosaver:
+    """
+    Writes snapshots on a background thread so the Tk loop never waits on disk
+
+    The state is captured when a save is requested; encoding and writing
+    happen on the worker. If a game is saved again before the worker got to
+    it, only the newest state is written.
+    """
+
+    def __init__(self) -> None:
+        self._pending: Dict[str, GameState] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread: Optional[threading.Thread] = None
+
+    def request(self, engine: 'GameEngine', path: str) -> None:
+        """Save engine's game to path in the background"""
+        state = capture(engine)
+        with self._lock:
+            self._pending[path] = state
+            self._idle.clear()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def discard(self, path: str, timeout: float = 5.0) -> None:
+        """Drop a pending save to path and wait until nothing is being written"""
+        with self._lock:
+            self._pending.pop(path, None)
+        self.flush(timeout)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait for pending saves to be written; returns False on timeout"""
+        return self._idle.wait(timeout)
+
+    def _run(self) -> None:
+        """Worker loop writing pending snapshots"""
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            while True:
+                with self._lock:
+                    if not self._pending:
+                        self._idle.set()
+                        break
+                    path, state = self._pending.popitem()
+                try:
+                    write_atomic(path, encode(state))
+                except OSError as e:
+                    print(f"Error autosaving {path}: {e}")
+
+
+class _Reader:
+    """Sequential reader over a snapshot body"""
+
+    def __init__(self, data: memoryview):
+        self.data = data
+        self.offset = 0
+
+    def unpack(self, fmt: struct.Struct) -> tuple:
+        try:
+            values = fmt.unpack_from(self.data, self.offset)
+        except struct.error:
+            raise ValueError("Snapshot is truncated") from None
+        self.offset += fmt.size
+        return values
+
+    def string(self) -> Optional[str]:
+        (length,) = self.unpack(_U32)
+        if length == NONE_LENGTH:
+            return None
+        end = self.offset + length
+        if end > len(self.data):
+            raise ValueError("Snapshot is truncated")
+        value = bytes(self.data[self.offset:end]).decode("utf-8")
+        self.offset = end
+        return value
+
+
+def _pack_str(out: bytearray, value: Optional[str]) -> None:
+    """Append a length-prefixed string (or None)"""
+    if value is None:
+        out += _U32.pack(NONE_LENGTH)
+        return
+    raw = value.encode("utf-8")
+    out += _U32.pack(len(raw))
+    out += raw
@@ -0,0 +1,81 @@
+"""
+startup_profiler.py - Import timing and time-to-first-paint for `Helper.py --profile-startup`
+"""
+import builtins
+import importlib.util
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class StartupProfiler:
+    """
+    Records how long each module takes to import and when the first frame is painted
+
+    Times are measured from install(). Only a module's first import is
+    recorded; its self time excludes the modules it imported in turn.
+    """
+
+    def __init__(self) -> None:
+        self.start: float = 0.0
+        self.first_paint: Optional[float] = None
+        self.imports: Dict[str, Tuple[float, float]] = {}  # module -> (cumulative, self)
+        self._stack: List[float] = []  # Time spent in nested imports, per level
+        self._original_import = builtins.__import__
+
+    def install(self) -> None:
+        """Start timing imports"""
+        self.start = time.perf_counter()
+        builtins.__import__ = self._timed_import
+
+    def uninstall(self) -> None:
+        """Stop timing imports"""
+        builtins.__import__ = self._original_import
+
+    def mark_first_paint(self) -> None:
+        """Record the first paint, stop timing imports and print the report"""
+        if self.first_paint is not None:
+            return
+        self.first_paint = time.perf_counter() - self.start
+        self.uninstall()
+        print(self.report())
+
+    def report(self, limit: int = 20) -> str:
+        """Format the slowest imports and the time to first paint"""
+        lines = [f"{'cumulative ms':>14} {'self ms':>9}  module"]
+        slowest = sorted(self.imports.items(), key=lambda item: item[1][0], reverse=True)
+        for name, (cumulative, own) in slowest[:limit]:
+            lines.append(f"{cumulative * 1000:14.1f} {own * 1000:9.1f}  {name}")
+
+        total = sum(own for _, own in self.imports.values())
+        lines.append(f"{len(self.imports)} modules imported in {total * 1000:.1f} ms")
+        if self.first_paint is not None:
+            lines.append(f"Time to first paint: {self.first_paint * 1000:.1f} ms")
+        return "\n".join(lines)
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        """builtins.__import__ replacement timing first-time imports"""
+        module_name = name
+        if level:
+            try:
+                package = (globals or {}).get("__package__")
+                module_name = importlib.util.resolve_name("." * level + name, package)
+            except (ImportError, ValueError):
+                pass
+        if module_name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        self._stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - started
+            nested = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            if module_name not in self.imports:
+                self.imports[module_name] = (elapsed, elapsed - nested)
+
+
+profiler = StartupProfiler()
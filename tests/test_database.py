@@ -0,0 +1,137 @@
+"""
+test_database.py - Roster indexes, role counters and vote tallies of the Database
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database, VoteLedger
+
+
+def make_db(total_players: int = 5, total_mafias: int = 1) -> Database:
+    db = Database()
+    db.change_player_num(total_players)
+    db.change_mafia_num(total_mafias)
+    return db
+
+
+def test_renaming_one_of_two_namesakes_keeps_the_other_findable():
+    db = make_db()
+    db.change_players_list("Ann", "sheriff", 1)
+    db.change_players_list("Ann", "doctor", 2)
+    db.change_player_name("Zed", 2)
+
+    assert db.find_player("Ann") == 0
+    assert db.role_of("ann") == "sheriff"
+    assert db.role_of("Zed") == "doctor"
+    assert db.eliminate_player("Ann")
+    assert db.is_eliminated("Ann")
+
+
+def test_eliminating_a_namesake_leaves_the_other_in_the_game():
+    db = make_db()
+    db.change_players_list("Bo", "villager", 1)
+    db.change_players_list("Bo", "villager", 2)
+
+    assert db.eliminate_player("Bo")
+    assert db.role_of("Bo") == "villager"
+    assert db.players_with_role("villager") == {"Bo"}
+    assert db.eliminate_player("Bo")
+    assert db.role_of("Bo") is None
+    assert db.players_with_role("villager") == set()
+
+
+def test_role_counters_follow_assignments_and_eliminations():
+    db = make_db(total_players=5, total_mafias=2)
+    for position, (name, role) in enumerate(
+            [("A", "mafia"), ("B", "mafia"), ("C", "sheriff"), ("D", "doctor"), ("E", "villager")], start=1):
+        db.change_players_list(name, role, position)
+    assert db.role_counts == {"": 0, "villager": 1, "mafia": 2, "sheriff": 1, "doctor": 1}
+    assert db.mafias_list == ["A", "B"]
+    assert db.sheriff == "C" and db.doctor == "D"
+
+    with pytest.raises(ValueError, match="Too many mafias"):
+        db.change_players_list("E", "mafia", 5)
+    assert db.role_counts["villager"] == 1
+
+    db.eliminate_player("a")
+    assert db.role_counts["mafia"] == 1
+    assert db.mafias_list == ["B"]
+    assert (db.players_left, db.mafias_left) == (3, 1)
+    assert db.eliminated_players == ["A"]
+    assert db.players_with_role("mafia") == {"B"}
+
+
+def test_lookups_are_case_insensitive_and_skip_eliminated_players():
+    db = make_db()
+    db.change_players_list("Ann", "doctor", 3)
+    assert db.find_player("ANN") == 2
+    assert db.player("ann").role.value == "doctor"
+    db.eliminate_player("Ann")
+    assert db.find_player("Ann") is None
+    assert db.player("Ann") is not None
+    assert not db.eliminate_player("Ann")
+
+
+def test_reassigning_a_seat_moves_it_between_role_indexes():
+    db = make_db()
+    db.change_players_list("Ann", "sheriff", 1)
+    db.change_players_list("Ann", "doctor", 1)
+    assert db.sheriff is None and db.doctor == "Ann"
+    assert db.role_counts["sheriff"] == 0 and db.role_counts["doctor"] == 1
+    assert db.role_counts[""] == 4
+
+
+def test_ledger_replaces_changed_votes():
+    ledger = VoteLedger()
+    ledger.cast("a", "X")
+    ledger.cast("b", "x")
+    ledger.cast("a", "y")
+    assert ledger.tallies == {"x": 1, "y": 1}
+    assert ledger.total() == 2
+    assert [entry[1] for entry in ledger.audit] == ["cast", "cast", "change"]
+
+
+def test_ledger_breaks_ties_alphabetically():
+    ledger = VoteLedger()
+    for voter, votee in [("a", "carl"), ("b", "bea"), ("c", "alex"), ("d", "carl"), ("e", "bea")]:
+        ledger.cast(voter, votee)
+    assert ledger.leader() == ("bea", 2)
+    assert ledger.runner_up() == ("carl", 2)
+
+    ledger.retract("e")
+    assert ledger.leader() == ("carl", 2)
+    assert ledger.runner_up() == ("alex", 1)
+
+
+def test_ledger_leader_drops_when_votes_are_withdrawn():
+    ledger = VoteLedger()
+    ledger.cast("a", "x")
+    ledger.cast("b", "x")
+    ledger.cast("c", "y")
+    ledger.cast("b", "y")
+    assert ledger.leader() == ("y", 2)
+    assert ledger.runner_up() == ("x", 1)
+    ledger.clear()
+    assert ledger.leader() is None and ledger.runner_up() is None
+
+
+def test_anonymous_votes_are_counted_separately():
+    ledger = VoteLedger()
+    ledger.cast(None, "x")
+    ledger.cast(None, "x")
+    assert ledger.leader() == ("x", 2)
+    assert ledger.anonymous_count == 2
+
+
+def test_doctor_save_passes_the_night_kill_to_the_runner_up():
+    helper = Database().Night_Day_Helper()
+    helper.add_vote("Bea", voter="a")
+    helper.add_vote("Bea", voter="b")
+    helper.add_vote("Carl", voter="c")
+    helper.set_doctor_save("bea")
+    target, _ = helper.most_voted()
+    assert target == "carl"
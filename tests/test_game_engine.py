@@ -0,0 +1,39 @@
+"""
+test_game_engine.py - Night and day resolution of the GameEngine
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_engine import GameEngine
+from journal import EventType
+from notifications import CHECKPOINT
+from test_journal import start_game
+
+
+def test_voting_out_an_unknown_player_records_no_elimination():
+    engine = GameEngine()
+    start_game(engine)
+    events = []
+    engine.bus.subscribe(EventType.ELIMINATION, lambda topic, data: events.append(data))
+    engine.day_vote("a", "nobody")
+    engine.day_vote("b", "nobody")
+
+    resolution = engine.resolve_day()
+    assert resolution.eliminated is None
+    assert events == []
+    assert engine.db.players_left + engine.db.mafias_left == 5
+
+
+def test_checkpoint_waits_for_the_end_of_a_batch():
+    engine = GameEngine()
+    start_game(engine)
+    engine.night_dialogue("a", "b looks suspicious")
+    seen = []
+    engine.bus.subscribe(CHECKPOINT, lambda topic, data: seen.append(len(engine.helper.transcript)))
+    with engine.batch():  # What the Night window does when the phase changes
+        engine.set_phase("night", 2)
+        engine.clear("dialogues")
+        assert seen == []
+    assert seen == [0]
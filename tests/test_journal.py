@@ -0,0 +1,73 @@
+"""
+test_journal.py - Replaying a journal rebuilds the same game
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_engine import GameEngine
+from journal import EventJournal, load, replay
+from snapshot import capture, save
+from snapshot import load as snapshot_load
+
+ROSTER = [("a", "mafia"), ("b", "villager"), ("c", "sheriff"), ("d", "doctor"), ("e", "villager")]
+
+
+def start_game(engine: GameEngine) -> None:
+    engine.set_player_count(len(ROSTER))
+    engine.set_mafia_count(1)
+    for position, (name, role) in enumerate(ROSTER, start=1):
+        engine.assign(position, name, role)
+    engine.lock_roles()
+
+
+def test_replay_matches_live_game_after_undoing_a_batch(tmp_path):
+    journal = EventJournal(str(tmp_path / "game.jsonl"))
+    live = GameEngine(journal=journal)
+    start_game(live)
+    live.night_dialogue("a", "b looks suspicious")
+    with live.batch():  # What the Night window does when the phase changes
+        live.set_phase("night", 2)
+        live.clear("dialogues")
+    live.night_vote("a", "b")
+    assert live.undo()
+    assert live.undo()
+    journal.close()
+
+    replayed = replay(load(journal.path))
+    assert live.helper.night_phase == 1
+    assert capture(replayed) == capture(live)
+
+
+def test_replay_matches_live_game_after_redo(tmp_path):
+    journal = EventJournal(str(tmp_path / "game.jsonl"))
+    live = GameEngine(journal=journal)
+    start_game(live)
+    with live.batch():
+        live.set_phase("night", 2)
+        live.clear("votes")
+    live.undo()
+    live.redo()
+    live.night_vote("a", "c")
+    journal.close()
+
+    assert capture(replay(load(journal.path))) == capture(live)
+
+
+def test_replay_includes_a_restored_snapshot(tmp_path):
+    saved = GameEngine()
+    start_game(saved)
+    saved.night_dialogue("a", "b looks suspicious")
+    saved.night_vote("a", "b")
+    snapshot_path = str(tmp_path / "saved.snap")
+    save(saved, snapshot_path)
+
+    journal = EventJournal(str(tmp_path / "game.jsonl"))
+    live = GameEngine(journal=journal)
+    snapshot_load(snapshot_path, live)
+    os.remove(snapshot_path)  # The journal must not depend on the file
+    live.night_vote("a", "c")
+    journal.close()
+
+    assert capture(replay(load(journal.path))) == capture(live)
@@ -0,0 +1,60 @@
+"""
+test_photo_registry.py - Eviction and restore of shared Tk images (needs a display)
+"""
+import os
+import sys
+import tkinter as tk
+
+import pytest
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import PhotoImageRegistry
+
+
+@pytest.fixture
+def root():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("No display available")
+    root.withdraw()
+    yield root
+    root.destroy()
+
+
+class Holder:
+    """Keeps the shown image like Helper.ImageLabel does"""
+    def __init__(self, label: tk.Label):
+        self.label = label
+        self.current_image = None
+
+    def set_image(self, image):
+        self.current_image = image
+        self.label.config(image=image or "")
+
+
+class FakeScheduler:
+    def __init__(self):
+        self.requests = []
+
+    def schedule(self, widget, path, width, height, on_ready):
+        self.requests.append((str(widget), path, width, height, on_ready))
+
+
+def test_eviction_releases_the_holder_and_restores_through_the_scheduler(root):
+    registry = PhotoImageRegistry(cache=None)
+    registry.scheduler = FakeScheduler()
+    holder = Holder(tk.Label(root))
+    key = ("bg.png", 8, 6)
+    holder.set_image(registry.assign(holder.label, *key, image=Image.new("RGB", (8, 6)),
+                                     on_ready=holder.set_image))
+    assert holder.current_image is registry.get(*key)
+
+    registry._evict(key)
+    assert holder.current_image is None
+    assert registry.get(*key) is None
+
+    registry._on_visible(str(holder.label))
+    assert registry.scheduler.requests == [(str(holder.label), *key, holder.set_image)]
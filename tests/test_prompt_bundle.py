@@ -0,0 +1,75 @@
+"""
+test_prompt_bundle.py - Export of a phase's prompts to one bundle file
+"""
+import json
+import os
+import sys
+import zipfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_engine import GameEngine
+from prompt_bundle import MANIFEST_NAME, export, phase_prompts
+from test_journal import ROSTER, start_game
+from windows.prompts.templates import render_day_prompt
+
+
+def started_game() -> GameEngine:
+    engine = GameEngine()
+    start_game(engine)
+    return engine
+
+
+def test_jsonl_bundle_holds_one_record_per_player(tmp_path):
+    engine = started_game()
+    engine.end_night()
+    engine.day_dialogue("a", "hello")
+    path = str(tmp_path / "day.jsonl")
+
+    assert export(engine, path, "day") == len(ROSTER)
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert [r["player"] for r in records] == [name for name, _ in ROSTER]
+    assert [r["position"] for r in records] == list(range(1, len(ROSTER) + 1))
+    assert all(r["phase"] == "day" and r["number"] == 1 and r["step"] == 1 for r in records)
+    assert records[0]["prompt"] == render_day_prompt(1, 1, engine.helper.get_dialogues())
+    assert not os.path.exists(path + ".tmp")
+
+
+def test_zip_bundle_holds_a_file_per_player_and_a_manifest(tmp_path):
+    engine = started_game()
+    path = str(tmp_path / "night.zip")
+
+    export(engine, path, "night", overrides={"sheriff": "c is not mafia"})
+    with zipfile.ZipFile(path) as bundle:
+        manifest = [json.loads(line) for line in bundle.read(MANIFEST_NAME).decode().splitlines()]
+        assert len(manifest) == len(ROSTER)
+        sheriff = next(record for record in manifest if record["role"] == "sheriff")
+        assert bundle.read(sheriff["file"]).decode() == "c is not mafia"
+        assert "prompt" not in sheriff
+
+
+def test_only_the_mafia_night_prompt_shows_the_dialogues():
+    engine = started_game()
+    engine.night_dialogue("a", "let's take b")
+    prompts = {record["role"]: record["prompt"] for record in phase_prompts(engine, "night")}
+    assert "let's take b" in prompts["mafia"]
+    assert "let's take b" not in prompts["villager"]
+
+
+def test_eliminated_players_are_left_out():
+    engine = started_game()
+    engine.night_vote("a", "b")
+    engine.resolve_night()
+    assert "b" not in [record["player"] for record in phase_prompts(engine, "initial")]
+
+
+def test_unknown_phase_or_extension_is_rejected(tmp_path):
+    engine = started_game()
+    with pytest.raises(ValueError):
+        list(phase_prompts(engine, "dusk"))
+    with pytest.raises(ValueError):
+        export(engine, str(tmp_path / "day.txt"), "day")
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,68 @@
+"""
+test_resize_scheduler.py - Delivery of finished resizes on the Tk thread
+"""
+import os
+import sys
+import tkinter as tk
+from concurrent.futures import Future
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import ResizeScheduler
+
+
+class FakeWidget:
+    """Stands in for a Tk widget; needs no display"""
+    def __init__(self, name: str):
+        self.name = name
+
+    def winfo_exists(self) -> bool:
+        return True
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class FakeRegistry:
+    def assign(self, widget, path, width, height, image, on_ready):
+        return image
+
+
+class FakeRoot:
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, delay, callback, *args):
+        self.scheduled.append((callback, args))
+
+
+def finished(result=None, error=None) -> Future:
+    future = Future()
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+    return future
+
+
+def test_poll_keeps_delivering_after_a_failed_delivery():
+    scheduler = ResizeScheduler(cache=None, registry=FakeRegistry())
+    delivered = []
+
+    def destroyed(image):
+        raise tk.TclError('invalid command name ".label"')
+
+    jobs = [
+        (FakeWidget(".a"), finished(error=RuntimeError("broken job")), delivered.append),
+        (FakeWidget(".b"), finished("image-b"), destroyed),
+        (FakeWidget(".c"), finished("image-c"), delivered.append),
+    ]
+    for widget, future, on_ready in jobs:
+        scheduler._generation[str(widget)] = 1
+        scheduler._results.put((widget, str(widget), 1, future, on_ready, "bg.png", 10, 10))
+    scheduler._in_flight = len(jobs) + 1  # One more resize still running
+
+    root = FakeRoot()
+    scheduler._poll(root)
+    assert delivered == ["image-c"]
+    assert root.scheduled == [(scheduler._poll, (root,))]
@@ -0,0 +1,65 @@
+"""
+test_sessions.py - Saves of the games held by a SessionManager
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sessions import SessionManager
+from snapshot import capture, save
+from snapshot import load as snapshot_load
+from test_journal import start_game
+
+
+def write_save(directory, stem: str, mtime: float) -> None:
+    for extension in (".jsonl", ".snap"):
+        path = os.path.join(directory, stem + extension)
+        open(path, "w").close()
+        os.utime(path, (mtime, mtime))
+
+
+def test_saves_are_only_pruned_when_asked(tmp_path):
+    for number in range(SessionManager.KEEP_SAVES + 3):
+        write_save(tmp_path, f"old-{number:02d}", mtime=1000 + number)
+    sessions = SessionManager(str(tmp_path))
+    assert len(os.listdir(tmp_path)) == 2 * (SessionManager.KEEP_SAVES + 3)
+
+    deleted = sessions.prune_saves()
+    assert sorted(os.path.basename(path) for path in deleted) == [
+        "old-00.jsonl", "old-00.snap", "old-01.jsonl", "old-01.snap", "old-02.jsonl", "old-02.snap"
+    ]
+    sessions.shutdown()
+
+
+def test_closing_a_game_deletes_its_saves(tmp_path):
+    sessions = SessionManager(str(tmp_path))
+    session = sessions.current
+    start_game(session.engine)
+    sessions.autosaver.flush()
+    assert os.path.exists(session.snapshot_path)
+
+    sessions.close(session.id)
+    assert not os.path.exists(session.snapshot_path)
+    assert not os.path.exists(session.journal.path)
+    sessions.shutdown()
+
+
+def test_restore_does_not_overwrite_the_previous_save(tmp_path):
+    saved = SessionManager(None).current.engine
+    start_game(saved)
+    saved_path = str(tmp_path / "saved.snap")
+    save(saved, saved_path)
+
+    sessions = SessionManager(str(tmp_path))
+    session = sessions.current
+    start_game(session.engine)
+    sessions.autosaver.flush()
+    previous_path, previous_state = session.snapshot_path, capture(session.engine)
+
+    sessions.restore(saved_path)
+    sessions.autosaver.flush()
+    assert session.snapshot_path == saved_path
+    assert capture(snapshot_load(previous_path)) == previous_state
+    assert capture(snapshot_load(saved_path)) == capture(session.engine)
+    sessions.shutdown()
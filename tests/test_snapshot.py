@@ -0,0 +1,63 @@
+"""
+test_snapshot.py - Encoding and decoding of binary save files
+"""
+import os
+import struct
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_engine import GameEngine
+from snapshot import MAGIC, VERSION, _HEADER, capture, decode, encode, latest_snapshot, load, save
+from test_journal import start_game
+
+
+def played_game() -> GameEngine:
+    engine = GameEngine()
+    start_game(engine)
+    engine.night_dialogue("a", "Zoë says \"hi\" — in UTF-8")
+    engine.night_vote("a", "b")
+    engine.doctor_save("c")
+    engine.resolve_night()
+    engine.end_night()
+    engine.day_dialogue("c", "I trust d")
+    engine.day_vote("c", "a")
+    return engine
+
+
+def test_encode_decode_round_trip():
+    state = capture(played_game())
+    assert decode(encode(state)) == state
+    assert state.eliminated_seats == (1,)
+    assert state.dialogues == (("c", "I trust d"),)
+
+
+def test_load_restores_into_another_engine(tmp_path):
+    live = played_game()
+    path = str(tmp_path / "game.snap")
+    save(live, path)
+    assert capture(load(path)) == capture(live)
+    assert latest_snapshot(str(tmp_path)) == path
+
+
+def test_decode_rejects_a_crc_mismatch():
+    data = bytearray(encode(capture(played_game())))
+    data[-1] ^= 0xFF
+    with pytest.raises(ValueError, match="corrupted"):
+        decode(bytes(data))
+
+
+def test_decode_rejects_an_unknown_version():
+    data = encode(capture(played_game()))
+    _, _, crc, length = _HEADER.unpack_from(data)
+    newer = _HEADER.pack(MAGIC, VERSION + 1, crc, length) + data[_HEADER.size:]
+    with pytest.raises(ValueError, match="Unsupported snapshot version"):
+        decode(newer)
+
+
+@pytest.mark.parametrize("data", [b"", b"MSNP", struct.pack("<4sHII", b"NOPE", 1, 0, 0)])
+def test_decode_rejects_data_that_is_not_a_snapshot(data):
+    with pytest.raises(ValueError):
+        decode(data)
@@ -0,0 +1,69 @@
+"""
+test_templates.py - Compiled prompt templates render what the chained replaces rendered
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from windows.prompts.all_prompts import all_prompts_dict
+from windows.prompts.templates import (
+    CompiledTemplate, NIGHT_ALIASES, compiled_prompts, day_prompt_values, initial_prompt_values,
+    night_prompt_values, render_day_prompt, render_initial_prompts, render_night_prompt,
+)
+
+PLAYERS = {"ann": "mafia", "bob": "villager", "cid": "sheriff", "dee": "doctor", "eve": "mafia"}
+DIALOGUES = "1. Ann: I think Bob is quiet\n2. Bob: Cid voted weirdly"
+
+
+def replace_all(text: str, placeholders: dict, values: dict) -> str:
+    """The renderer the windows used before templates were compiled"""
+    for key, token in placeholders.items():
+        if token and key in values:
+            text = text.replace(token, str(values[key]))
+    return text
+
+
+def test_initial_prompts_match_chained_replaces():
+    rendered = dict(render_initial_prompts(PLAYERS, 5, 2, ["ann", "eve"]))
+    for name, values in initial_prompt_values(PLAYERS, 5, 2, ["ann", "eve"]):
+        data = all_prompts_dict["initial"][PLAYERS[name]]
+        assert rendered[name] == replace_all(data["prompt"], data["placeholders"], values)
+    assert "eve" in rendered["ann"] and "[MAFIA_PARTNERS]" not in rendered["ann"]
+
+
+@pytest.mark.parametrize("role", ["villager", "sheriff", "doctor", "mafia"])
+@pytest.mark.parametrize("phase", [1, 2])
+def test_night_prompts_match_chained_replaces(role, phase):
+    data = all_prompts_dict["night"][role]
+    values = night_prompt_values(role, 3, phase, DIALOGUES)
+    expected = replace_all(data["prompt"], {**data["placeholders"], **NIGHT_ALIASES}, values)
+    assert render_night_prompt(role, 3, phase, DIALOGUES) == expected
+
+
+@pytest.mark.parametrize("phase", [1, 2])
+def test_day_prompt_matches_chained_replaces(phase):
+    data = all_prompts_dict["day"]
+    expected = replace_all(data["prompt"], data["placeholders"], day_prompt_values(2, phase, DIALOGUES))
+    assert render_day_prompt(2, phase, DIALOGUES) == expected
+
+
+def test_values_that_look_like_placeholders_are_not_substituted():
+    prompt = render_day_prompt(4, 1, "1. [DAY_NUMBER]: hello")
+    assert "1. [DAY_NUMBER]: hello" in prompt
+
+
+def test_missing_values_leave_the_placeholder():
+    template = CompiledTemplate("Night [N], phase [P]", {"night": "[N]", "phase": "[P]", "unused": None})
+    assert template.keys == {"night", "phase"}
+    assert template.render(night=2) == "Night 2, phase [P]"
+
+
+def test_token_count_matches_the_rendered_text():
+    template = compiled_prompts()["day"]
+    values = day_prompt_values(1, 2, DIALOGUES)
+    assert template.token_count(len, **values) == len(template.render(**values))
+    counted = {"dialogues": len(DIALOGUES)}
+    assert template.token_count(len, counted, **{**values, "dialogues": ""}) == len(template.render(**values))
@@ -0,0 +1,76 @@
+"""
+test_token_estimator.py - Heuristic token counts and the context budget
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import token_estimator
+from database import Transcript
+from token_estimator import (
+    BudgetConfig, HeuristicCounter, TiktokenCounter, budget_text, budget_usage, count_tokens, estimate,
+    get_counter, set_counter,
+)
+from windows.prompts.templates import compiled_prompts, day_prompt_values
+
+
+@pytest.fixture
+def heuristic():
+    set_counter(HeuristicCounter())
+    yield get_counter()
+    set_counter(None)
+
+
+@pytest.mark.parametrize("text, tokens", [
+    ("", 0),
+    ("hello", 1),
+    ("hello world", 2),
+    ("extraordinarily", 3),   # Long words split into several tokens
+    ("12345678", 3),          # Digits in groups of up to three
+    ("Hi!!", 2),
+    ("héé", 3),               # Non-ASCII characters count one each
+])
+def test_heuristic_counts(text, tokens):
+    assert HeuristicCounter()(text) == tokens
+
+
+def test_heuristic_is_close_to_a_word_count_for_prose():
+    text = "The mafia will try to eliminate the sheriff before the town finds them. " * 20
+    words = len(text.split())
+    assert words <= HeuristicCounter()(text) <= words * 1.5
+
+
+def test_estimate_matches_counting_the_rendered_prompt(heuristic):
+    template = compiled_prompts()["day"]
+    values = day_prompt_values(1, 1, "1. Ann: hello")
+    rendered = count_tokens(template.render(**values))
+    assert abs(estimate(template, **values) - rendered) <= 3
+
+
+def test_transcript_keeps_a_running_token_count(heuristic):
+    transcript = Transcript()
+    assert transcript.token_count() == heuristic(transcript.text)
+    transcript.add("ann", "I think bob is the mafia")
+    transcript.add("bob", "no way")
+    transcript.add("ann", "fine, cid then")
+    assert abs(transcript.token_count() - heuristic(transcript.text)) <= len(transcript)
+    transcript.clear()
+    assert transcript.token_count() == heuristic(transcript.text)
+
+
+def test_budget_usage_and_text():
+    assert budget_usage(BudgetConfig.CONTEXT_BUDGET // 2) == 0.5
+    assert budget_usage(250, budget=1000) == 0.25
+    assert budget_text(1234, budget=8192) == "~1,234 / 8,192 tokens (15%)"
+
+
+def test_uncached_tiktoken_encoding_falls_back_to_the_heuristic(monkeypatch, tmp_path):
+    monkeypatch.setenv("TIKTOKEN_CACHE_DIR", str(tmp_path))
+    assert not TiktokenCounter.is_cached("cl100k_base")
+    assert not TiktokenCounter.is_cached("unknown_encoding")
+    monkeypatch.setattr(token_estimator, "_counter", None)
+    assert isinstance(get_counter(), HeuristicCounter)
+    set_counter(None)
@@ -0,0 +1,133 @@
+"""
+token_estimator.py - Offline token counts of prompts, measured against a context budget
+"""
+import hashlib
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+TokenCounter = Callable[[str], int]  # text -> number of tokens
+
+
+@dataclass
+class BudgetConfig:
+    """Context budget the prompts are measured against"""
+    CONTEXT_BUDGET = 8192  # Tokens an LLM chat can hold
+    WARN_RATIO = 0.8       # Share of the budget from which usage is shown as a warning
+
+
+class HeuristicCounter:
+    """
+    Rough, dependency-free approximation of a BPE tokenizer
+
+    Text is split the way GPT-style tokenizers pre-split it (words with
+    their leading space, groups of up to three digits, punctuation runs,
+    whitespace); short words count as one token, longer ones as several.
+    """
+    name = "heuristic"
+    _PIECES = re.compile(
+        r"'(?i:[sdmt]|ll|ve|re)|[^\r\n\w]?[^\W\d_]+|\d{1,3}| ?[^\s\w]+[\r\n]*|\s*[\r\n]+|\s+(?!\S)|\s+"
+    )
+
+    def __call__(self, text: str) -> int:
+        tokens = 0
+        for piece in self._PIECES.findall(text):
+            word = piece.strip()
+            if not word or word[0].isdigit():
+                tokens += 1
+            elif not word.isascii():
+                tokens += len(word)  # Accented, CJK and symbol characters are rarely merged
+            elif word[-1].isalpha():
+                tokens += 1 + max(0, len(word) - 4) // 5
+            else:
+                tokens += (len(word) + 1) // 2
+        return tokens
+
+
+class TiktokenCounter:
+    """
+    Exact counts with a tiktoken encoding
+
+    Only an encoding already in tiktoken's local cache is used; the counter
+    is created on the Tk thread, so it never downloads one.
+
+    Raises:
+        ImportError: If tiktoken is not installed
+        FileNotFoundError: If the encoding is not cached locally
+    """
+    # Where tiktoken downloads each encoding from; the cache file is named after it
+    ENCODING_URLS = {
+        "cl100k_base": "https://openaipublic.blob.core.windows.net/encodings/cl100k_base.tiktoken",
+        "o200k_base": "https://openaipublic.blob.core.windows.net/encodings/o200k_base.tiktoken",
+    }
+
+    def __init__(self, encoding: str = "cl100k_base"):
+        import tiktoken
+        if not self.is_cached(encoding):
+            raise FileNotFoundError(f"tiktoken encoding {encoding!r} is not cached locally")
+        self.name = encoding
+        self._encoding = tiktoken.get_encoding(encoding)
+
+    @classmethod
+    def is_cached(cls, encoding: str) -> bool:
+        """Whether tiktoken can load encoding without downloading it"""
+        url = cls.ENCODING_URLS.get(encoding)
+        if url is None:
+            return False
+        # Same lookup as tiktoken.load.read_file_cached
+        cache_dir = (os.environ.get("TIKTOKEN_CACHE_DIR") or os.environ.get("DATA_GYM_CACHE_DIR")
+                     or os.path.join(tempfile.gettempdir(), "data-gym-cache"))
+        return os.path.isfile(os.path.join(cache_dir, hashlib.sha1(url.encode()).hexdigest()))
+
+    def __call__(self, text: str) -> int:
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+
+_counter: Optional[TokenCounter] = None
+
+
+def get_counter() -> TokenCounter:
+    """The counter in use: tiktoken's if it is installed and its encoding is cached, else the heuristic"""
+    global _counter
+    if _counter is None:
+        try:
+            _counter = TiktokenCounter()
+        except Exception:  # Not installed, encoding not cached, or the cached file is unreadable
+            _counter = HeuristicCounter()
+    return _counter
+
+
+def set_counter(counter: Optional[TokenCounter]) -> None:
+    """Count tokens with counter from now on (None picks the default again)"""
+    global _counter
+    _counter = counter
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in text"""
+    return get_counter()(text)
+
+
+def estimate(template, counted: Optional[Dict[str, int]] = None, **values) -> int:
+    """
+    Number of tokens template.render(**values) would have
+
+    The template's fixed text is counted once per counter and cached, so
+    this costs about as much as counting the values. Values whose tokens
+    are already known (e.g. a Transcript's running total) are passed in
+    counted, per placeholder key, and not counted again.
+    """
+    return template.token_count(get_counter(), counted, **values)
+
+
+def budget_usage(tokens: int, budget: Optional[int] = None) -> float:
+    """Share of the context budget taken by tokens"""
+    return tokens / (budget or BudgetConfig.CONTEXT_BUDGET)
+
+
+def budget_text(tokens: int, budget: Optional[int] = None) -> str:
+    """e.g. "~1,234 / 8,192 tokens (15%)" """
+    budget = budget or BudgetConfig.CONTEXT_BUDGET
+    return f"~{tokens:,} / {budget:,} tokens ({budget_usage(tokens, budget):.0%})"
@@ -1,18 +1,925 @@
 """
 utils.py - Refactored with subtle improvements
 """
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
 import tkinter as tk
+from tkinter import filedialog, messagebox
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from PIL import Image, ImageTk
-from typing import Tuple, Optional, Callable
-from database import Database
+from typing import Dict, List, Tuple, Optional, Callable
+from game_engine import GameEngine
+from journal import EventType
+import prompt_bundle
+import token_estimator
+from sessions import SessionManager
+
+
+ASSET_CACHE_DIR = ".asset_cache"
+
+# Large art scaled by the windows; these get a pre-scaled pyramid
+PYRAMID_SOURCES = [
+    "images/title_image.png",
+    "images/background_image.png",
+    "windows/night/night.png",
+    "windows/day/day.png",
+    "windows/prompts/prompts.png",
+    "windows/roles/roles.png",
+    "windows/total_players/total_players.png",
+]
+
+# Button animation frames: name -> (folder with frame_1/frame_2.png, display size)
+# A size of None keeps the frames at their native size
+BUTTON_SPRITES: Dict[str, Tuple[str, Optional[Tuple[int, int]]]] = {
+    "start_button": ("start_button", (82, 65)),
+    "roles_button": ("roles_button", (86, 48)),
+    "prompts_button": ("prompts_button", (97, 85)),
+    "night_button": ("night_button", (97, 85)),
+    "day_button": ("day_button", (97, 85)),
+    "reset_button": ("reset_button", (85, 75)),
+    "done_button": ("windows/total_players/done_button", None),
+}
+
+# Default size of every phase window, see Utilities.initialize_windows
+WINDOW_WIDTH, WINDOW_HEIGHT = 1100, 650
+
+# Images the phase windows show at their default size, in the order they are warmed up
+WARMUP_ASSETS: List[Tuple[str, Tuple[int, int]]] = [
+    ("windows/night/night.png", (WINDOW_WIDTH, round(WINDOW_HEIGHT * 0.3))),
+    ("windows/day/day.png", (WINDOW_WIDTH, round(WINDOW_HEIGHT * 0.3))),
+    ("images/background_image.png", (WINDOW_WIDTH, round(WINDOW_HEIGHT * 0.7))),
+    ("windows/prompts/prompts.png", (WINDOW_WIDTH, round(WINDOW_HEIGHT * 0.3))),
+    ("windows/roles/roles.png", (WINDOW_WIDTH, round(WINDOW_HEIGHT * 0.2))),
+    ("windows/total_players/total_players.png", (WINDOW_WIDTH, round(WINDOW_HEIGHT * 0.3))),
+    ("images/background_image.png", (1400, 650)),
+]
+
+
+# Resampling filter per quality tier: cheap drafts while a resize is live,
+# one high-quality pass once the size has settled
+RESAMPLE_QUALITY = {
+    "draft": Image.Resampling.NEAREST,
+    "final": Image.Resampling.LANCZOS,
+}
+
+
+class AssetPyramid:
+    """
+    Pre-scaled copies (mipmaps) of large images, halving in size per level
+    
+    Built ahead of time by build_assets.py. At runtime pick() returns the
+    smallest level that is still at least as large as the requested size,
+    so only a small final resize is left to do.
+    
+    Args:
+        directory: Folder holding the levels and their index.json
+    """
+    
+    MIN_LEVEL_SIZE = 128  # Stop halving once the shorter side gets this small
+    
+    def __init__(self, directory: str = os.path.join(ASSET_CACHE_DIR, "pyramid")) -> None:
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.json")
+        self._index: Optional[Dict[str, dict]] = None
+
+    def pick(self, path: str, width: int, height: int) -> str:
+        """Get the path of the best level to resize to (width, height) from"""
+        entry = self._load_index().get(path)
+        if not entry or not self._is_fresh(path, entry):
+            return path
+        
+        best = path
+        for level_width, level_height, level_path in entry["levels"]:
+            if level_width < width or level_height < height:
+                break  # Levels are ordered largest first
+            best = level_path
+        return best if os.path.exists(best) else path
+
+    def levels(self, path: str) -> List[str]:
+        """Get the file paths of the levels built for path, largest first"""
+        entry = self._load_index().get(path, {})
+        return [level_path for _, _, level_path in entry.get("levels", [])]
+
+    def build(self, paths: List[str]) -> Dict[str, dict]:
+        """Generate the levels for every path and write the index"""
+        os.makedirs(self.directory, exist_ok=True)
+        index = dict(self._load_index())
+        
+        for path in paths:
+            with Image.open(path) as source:
+                source.load()
+                levels = []
+                level = source
+                number = 1
+                while min(level.width, level.height) // 2 >= self.MIN_LEVEL_SIZE:
+                    level = level.resize(
+                        (level.width // 2, level.height // 2), Image.Resampling.LANCZOS
+                    )
+                    level_path = os.path.join(
+                        self.directory, f"{path.replace('/', '__')}.{number}.png"
+                    )
+                    level.save(level_path)
+                    levels.append([level.width, level.height, level_path])
+                    number += 1
+            
+            index[path] = {"mtime": os.path.getmtime(path), "levels": levels}
+        
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+        self._index = index
+        return index
+
+    def _load_index(self) -> Dict[str, dict]:
+        """Read the index once; a missing or broken index means no pyramid"""
+        if self._index is None:
+            try:
+                with open(self.index_path, encoding="utf-8") as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index  # type: ignore
+
+    def _is_fresh(self, path: str, entry: dict) -> bool:
+        """Check the levels were built from the current version of the source"""
+        try:
+            return os.path.getmtime(path) == entry["mtime"]
+        except OSError:
+            return False
+
+
+class ButtonAtlas:
+    """
+    Sprite atlas holding every button's normal and pressed frame, pre-sized
+    
+    Built by build_assets.py into one PNG plus an index.json of frame
+    rectangles, so startup decodes a single image instead of one per frame.
+    
+    Args:
+        cache: Image cache the atlas image is decoded through
+        directory: Folder holding atlas.png and index.json
+    """
+    
+    MAX_WIDTH = 1024  # Width of a shelf before the packer starts a new one
+    PADDING = 1
+    
+    def __init__(self, cache: "ImageCache",
+                 directory: str = os.path.join(ASSET_CACHE_DIR, "atlas")) -> None:
+        self.cache = cache
+        self.directory = directory
+        self.image_path = os.path.join(directory, "atlas.png")
+        self.index_path = os.path.join(directory, "index.json")
+        self._index: Optional[Dict[str, dict]] = None
+
+    def frames(self, name: str, size: Optional[Tuple[int, int]] = None
+               ) -> Optional[Tuple[Image.Image, Image.Image]]:
+        """Cut the (normal, pressed) frames of a button out of the atlas, or None if unavailable"""
+        entry = self._load_index().get(name)
+        if not entry or not self._is_fresh(entry):
+            return None
+        normal, pressed = entry["normal"], entry["pressed"]
+        if size and tuple(normal[2:]) != tuple(size):
+            return None  # Built for another display size
+        try:
+            atlas = self.cache.get_source(self.image_path)
+        except OSError:
+            return None
+        return atlas.crop(self._box(normal)), atlas.crop(self._box(pressed))
+
+    def build(self, sprites: Dict[str, Tuple[str, Optional[Tuple[int, int]]]]) -> Dict[str, dict]:
+        """Resize and pack every sprite's frames into the atlas and write the index"""
+        images = []
+        for name, (folder, size) in sprites.items():
+            for state, file_name in (("normal", "frame_1.png"), ("pressed", "frame_2.png")):
+                path = os.path.join(folder, file_name)
+                with Image.open(path) as image:
+                    image = image.convert("RGBA")
+                    if size:
+                        image = image.resize(size, Image.Resampling.LANCZOS)
+                images.append((name, state, path, image))
+        
+        # Shelf packing: tallest frames first, left to right, wrapping at MAX_WIDTH
+        images.sort(key=lambda item: item[3].height, reverse=True)
+        placements = []
+        x = y = shelf_height = width = 0
+        for name, state, path, image in images:
+            if x and x + image.width > self.MAX_WIDTH:
+                x, y = 0, y + shelf_height + self.PADDING
+                shelf_height = 0
+            placements.append((name, state, path, image, x, y))
+            x += image.width + self.PADDING
+            width = max(width, x)
+            shelf_height = max(shelf_height, image.height)
+        
+        atlas = Image.new("RGBA", (width, y + shelf_height), (0, 0, 0, 0))
+        index: Dict[str, dict] = {}
+        for name, state, path, image, x, y in placements:
+            atlas.paste(image, (x, y))
+            entry = index.setdefault(name, {"sources": {}})
+            entry[state] = [x, y, image.width, image.height]
+            entry["sources"][path] = os.path.getmtime(path)
+        
+        os.makedirs(self.directory, exist_ok=True)
+        atlas.save(self.image_path)
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2)
+        self.cache.evict(self.image_path)
+        self._index = index
+        return index
+
+    def _load_index(self) -> Dict[str, dict]:
+        """Read the index once; a missing or broken index means no atlas"""
+        if self._index is None:
+            try:
+                with open(self.index_path, encoding="utf-8") as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index  # type: ignore
+
+    def _is_fresh(self, entry: dict) -> bool:
+        """Check the frames were packed from the current version of their sources"""
+        try:
+            return all(os.path.getmtime(path) == mtime for path, mtime in entry["sources"].items())
+        except OSError:
+            return False
+
+    @staticmethod
+    def _box(rect: List[int]) -> Tuple[int, int, int, int]:
+        """Convert an [x, y, width, height] rectangle to a crop box"""
+        x, y, width, height = rect
+        return x, y, x + width, y + height
+
+
+class PixelCache:
+    """
+    On-disk cache of already decoded RGBA pixels, read back through mmap
+    
+    Each cache file is a small header (magic, width, height, source mtime)
+    followed by the raw RGBA rows. The cache is opt-in: it is only read and
+    written once its directory exists (build_assets.py creates it). Entries
+    whose source PNG has changed are rewritten on the next load.
+    
+    Args:
+        directory: Folder holding the raw pixel files
+    """
+    
+    HEADER = struct.Struct("<4sIId")
+    MAGIC = b"MPX1"
+    
+    def __init__(self, directory: str = os.path.join(ASSET_CACHE_DIR, "pixels")) -> None:
+        self.directory = directory
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache directory has been created"""
+        return os.path.isdir(self.directory)
+
+    def load(self, path: str) -> Optional[Image.Image]:
+        """Map the cached pixels of path without copying, or None if missing or stale"""
+        if not self.enabled:
+            return None
+        try:
+            with open(self._cache_path(path), "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, width, height, mtime = self.HEADER.unpack_from(buffer)
+            if magic != self.MAGIC or mtime != os.path.getmtime(path):
+                buffer.close()
+                return None
+            if len(buffer) != self.HEADER.size + width * height * 4:
+                buffer.close()
+                return None
+        except (OSError, ValueError, struct.error):
+            return None
+        
+        pixels = memoryview(buffer)[self.HEADER.size:]
+        return Image.frombuffer("RGBA", (width, height), pixels, "raw", "RGBA", 0, 1)
+
+    def store(self, path: str, image: Image.Image) -> None:
+        """Write the decoded pixels of path to the cache"""
+        if not self.enabled:
+            return
+        if image.mode != "RGBA":
+            image = image.convert("RGBA")
+        
+        cache_path = self._cache_path(path)
+        temp_path = cache_path + ".tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(self.HEADER.pack(
+                    self.MAGIC, image.width, image.height, os.path.getmtime(path)
+                ))
+                f.write(image.tobytes())
+            os.replace(temp_path, cache_path)  # Readers never see a half-written file
+        except OSError as e:
+            print(f"Error writing pixel cache for {path}: {e}")
+
+    def _cache_path(self, path: str) -> str:
+        """Get the cache file name for a source path"""
+        return os.path.join(self.directory, path.replace("/", "__") + ".rgba")
+
+
+def image_bytes(image: Image.Image) -> int:
+    """Approximate pixel memory of a decoded image"""
+    return image.width * image.height * len(image.getbands())
+
+
+class ImageMemoryBudget:
+    """
+    Byte limits for image memory held by the app
+    
+    ImageCache keeps its decoded and resized images under cache_bytes, and
+    PhotoImageRegistry keeps its Tk images under photo_bytes by dropping the
+    pixels of the images that have gone longest without being visible.
+    
+    Args:
+        cache_bytes: Limit for decoded source and resized images
+        photo_bytes: Limit for Tk images shown by widgets
+    """
+    
+    def __init__(self, cache_bytes: int = 128 * 1024 * 1024,
+                 photo_bytes: int = 64 * 1024 * 1024) -> None:
+        self.cache_bytes = cache_bytes
+        self.photo_bytes = photo_bytes
+
+
+class ImageCache:
+    """
+    Bounded LRU cache of decoded source images and their resized copies
+    
+    Args:
+        max_sources: Maximum number of decoded source images kept in memory
+        max_resized: Maximum number of resized images kept in memory
+        pyramid: Optional pre-scaled levels to resize from instead of the source
+        pixel_cache: Optional on-disk cache of decoded pixels to skip PNG decoding
+        budget: Optional byte limit for everything the cache holds
+    """
+    
+    def __init__(self, max_sources: int = 16, max_resized: int = 32,
+                 pyramid: Optional[AssetPyramid] = None,
+                 pixel_cache: Optional[PixelCache] = None,
+                 budget: Optional[ImageMemoryBudget] = None) -> None:
+        self.pyramid = pyramid
+        self.pixel_cache = pixel_cache
+        self.budget = budget
+        self.bytes: Dict[str, int] = {"source": 0, "resized": 0}
+        self.max_sources = max_sources
+        self.max_resized = max_resized
+        self._sources: "OrderedDict[str, Image.Image]" = OrderedDict()
+        self._resized: "OrderedDict[Tuple[str, int, int], Image.Image]" = OrderedDict()
+        self.hits: Dict[str, int] = {"source": 0, "resized": 0}
+        self.misses: Dict[str, int] = {"source": 0, "resized": 0}
+        self.evictions: int = 0
+        self._lock = threading.RLock()  # Shared with the resize worker thread; held only for lookups
+        self._loading: Dict[str, Future] = {}  # path -> decode in progress on some thread
+
+    def get_source(self, path: str) -> Image.Image:
+        """Return the decoded image at path, reading it from disk only on a miss"""
+        with self._lock:
+            image = self._sources.get(path)
+            if image is not None:
+                self._sources.move_to_end(path)
+                self.hits["source"] += 1
+                return image
+            future = self._loading.get(path)
+            if future is None:
+                self.misses["source"] += 1
+                future = self._loading[path] = Future()
+                loading = True
+            else:
+                loading = False
+        
+        if not loading:
+            return future.result()  # Another thread is decoding it already
+        
+        # Decode and write the pixel cache outside the lock, so the Tk thread's
+        # lookups (peek_resized, draft) never wait on disk or PNG decoding
+        try:
+            image = self._decode(path)
+        except BaseException as e:
+            with self._lock:
+                del self._loading[path]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._loading[path]
+            self._sources[path] = image
+            self.bytes["source"] += image_bytes(image)
+            self._trim()
+        future.set_result(image)
+        return image
+
+    def _decode(self, path: str) -> Image.Image:
+        """Read the pixels of path from the pixel cache, or decode the file"""
+        image = self.pixel_cache.load(path) if self.pixel_cache else None
+        if image is None:
+            image = Image.open(path)
+            image.load()  # Decode now so the file handle is released
+            if self.pixel_cache:
+                self.pixel_cache.store(path, image)
+        return image
+
+    def get_resized(self, path: str, width: int, height: int) -> Image.Image:
+        """Return the image at path resized to (width, height)"""
+        key = (path, width, height)
+        with self._lock:
+            image = self._resized.get(key)
+            if image is not None:
+                self._resized.move_to_end(key)
+                self.hits["resized"] += 1
+                return image
+            self.misses["resized"] += 1
+        source_path = self.pyramid.pick(path, width, height) if self.pyramid else path
+        source = self.get_source(source_path)
+        
+        # Resample outside the lock; PIL releases the GIL while resizing
+        image = source.resize((width, height), RESAMPLE_QUALITY["final"])
+        with self._lock:
+            if key not in self._resized:
+                self._resized[key] = image
+                self.bytes["resized"] += image_bytes(image)
+                self._trim()
+            else:
+                image = self._resized[key]
+        return image
+
+    def draft(self, path: str, width: int, height: int) -> Optional[Image.Image]:
+        """
+        Quickly resize an already decoded image for display during a live resize
+        
+        Drafts are not cached, and nothing is read from disk: None is returned
+        when neither the best pyramid level nor the source is decoded yet.
+        """
+        level_path = self.pyramid.pick(path, width, height) if self.pyramid else path
+        with self._lock:
+            source = self._sources.get(level_path)
+            if source is None:
+                source = self._sources.get(path)
+        if source is None:
+            return None
+        return source.resize((width, height), RESAMPLE_QUALITY["draft"])
+
+    def peek_resized(self, path: str, width: int, height: int) -> Optional[Image.Image]:
+        """Return the resized image if it is already cached, without loading anything"""
+        with self._lock:
+            return self._resized.get((path, width, height))
+
+    def evict(self, path: Optional[str] = None) -> int:
+        """
+        Drop cached images for path, or every cached image if path is None
+        
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        with self._lock:
+            if path is None:
+                removed = len(self._sources) + len(self._resized)
+                self._sources.clear()
+                self._resized.clear()
+                self.bytes = {"source": 0, "resized": 0}
+            else:
+                image = self._sources.pop(path, None)
+                if image is not None:
+                    self.bytes["source"] -= image_bytes(image)
+                    removed += 1
+                for key in [k for k in self._resized if k[0] == path]:
+                    self.bytes["resized"] -= image_bytes(self._resized.pop(key))
+                    removed += 1
+            self.evictions += removed
+        return removed
+
+    def stats(self) -> Dict[str, object]:
+        """Get current cache sizes and hit/miss counters"""
+        with self._lock:
+            return {
+                "sources": len(self._sources),
+                "resized": len(self._resized),
+                "bytes": dict(self.bytes),
+                "hits": dict(self.hits),
+                "misses": dict(self.misses),
+                "evictions": self.evictions,
+            }
+
+    def _trim(self) -> None:
+        """Evict least recently used entries until the count and byte limits are respected"""
+        while len(self._sources) > self.max_sources:
+            self._pop_oldest("source")
+        while len(self._resized) > self.max_resized:
+            self._pop_oldest("resized")
+        if self.budget is None:
+            return
+        # Resized copies are cheaper to rebuild than sources, so they go first
+        while sum(self.bytes.values()) > self.budget.cache_bytes and (self._resized or self._sources):
+            self._pop_oldest("resized" if self._resized else "source")
+
+    def _pop_oldest(self, tier: str) -> None:
+        """Drop the least recently used entry of a tier"""
+        entries = self._sources if tier == "source" else self._resized
+        _, image = entries.popitem(last=False)
+        self.bytes[tier] -= image_bytes(image)
+        self.evictions += 1
+
+
+class _PhotoEntry:
+    """A shared PhotoImage and the widgets holding it"""
+    
+    __slots__ = ("photo", "holders", "nbytes", "last_visible")
+    
+    def __init__(self, photo: ImageTk.PhotoImage, nbytes: int) -> None:
+        self.photo = photo
+        self.holders: set = set()
+        self.nbytes = nbytes
+        self.last_visible = time.monotonic()
+
+
+class PhotoImageRegistry:
+    """
+    Process-wide, reference-counted PhotoImages keyed by (path, width, height)
+    
+    Widgets showing the same image at the same size share one Tk image.
+    Each widget holds at most one entry; it is released when the widget is
+    given another image or destroyed, and the Tk image is freed once no
+    widget holds it anymore. Must only be used from the Tk thread.
+    
+    When a budget is given and the Tk images exceed it, the images that have
+    gone longest without being visible are dropped from their (hidden)
+    widgets. They are rendered again through the resize scheduler when the
+    widget becomes visible. Widgets shown through an on_ready callback are
+    cleared by calling it with None, so whoever keeps the PhotoImage alive
+    lets go of it too.
+    
+    Args:
+        cache: Image cache used to produce images that are not registered yet
+        budget: Optional byte limit for the registered Tk images
+    """
+    
+    def __init__(self, cache: ImageCache, budget: Optional[ImageMemoryBudget] = None) -> None:
+        self.cache = cache
+        self.budget = budget
+        self.evictions = 0
+        self._entries: Dict[Tuple[str, int, int], _PhotoEntry] = {}
+        self._held: Dict[str, Tuple[str, int, int]] = {}       # widget name -> key
+        self._evicted: Dict[str, Tuple[str, int, int]] = {}    # widget name -> key to restore
+        self._widgets: Dict[str, tk.Widget] = {}
+        self._show: Dict[str, Callable[[Optional[ImageTk.PhotoImage]], None]] = {}  # widget name -> on_ready
+        self.scheduler: Optional["ResizeScheduler"] = None  # Renders evicted images again off the Tk thread
+
+    def get(self, path: str, width: int, height: int) -> Optional[ImageTk.PhotoImage]:
+        """Get the registered PhotoImage for a key without taking a reference"""
+        entry = self._entries.get((path, width, height))
+        return entry.photo if entry else None
+
+    def holds(self, widget: tk.Widget) -> bool:
+        """Check whether widget currently holds a registered image"""
+        return str(widget) in self._held
+
+    def assign(self, widget: tk.Widget, path: str, width: int, height: int,
+               image: Optional[Image.Image] = None,
+               on_ready: Optional[Callable[[Optional[ImageTk.PhotoImage]], None]] = None
+               ) -> ImageTk.PhotoImage:
+        """
+        Take a reference to the PhotoImage for (path, width, height) on behalf of widget
+        
+        Args:
+            widget: Widget that will display the image
+            image: Already resized image to register if the key is new
+            on_ready: Callback that shows a PhotoImage on widget and keeps it;
+                called with None when the image is evicted
+        """
+        key = (path, width, height)
+        name = str(widget)
+        if on_ready is not None:
+            self._show[name] = on_ready
+        if name not in self._widgets:
+            self._widgets[name] = widget
+            widget.bind("<Destroy>", lambda e, n=name: self._on_destroy(e, n), add="+")
+            widget.bind("<Visibility>", lambda e, n=name: self._on_visible(n), add="+")
+            widget.bind("<Map>", lambda e, n=name: self._on_visible(n), add="+")
+        
+        entry = self._entries.get(key)
+        created = entry is None
+        if entry is None:
+            if image is None:
+                image = self.cache.get_resized(path, width, height)
+            entry = self._entries[key] = _PhotoEntry(ImageTk.PhotoImage(image), width * height * 4)
+        entry.holders.add(name)
+        entry.last_visible = time.monotonic()
+        
+        previous = self._held.get(name)
+        if previous is not None and previous != key:
+            self._release(previous, name)
+        self._held[name] = key
+        self._evicted.pop(name, None)
+        
+        if created:
+            self._enforce_budget(keep=key)
+        return entry.photo
+
+    def stats(self) -> Dict[str, int]:
+        """Get the number of shared images, references held and their pixel bytes"""
+        return {
+            "images": len(self._entries),
+            "references": sum(len(entry.holders) for entry in self._entries.values()),
+            "bytes": sum(entry.nbytes for entry in self._entries.values()),
+            "evicted_widgets": len(self._evicted),
+            "evictions": self.evictions,
+        }
+
+    def _enforce_budget(self, keep: Tuple[str, int, int]) -> None:
+        """Drop hidden images, least recently visible first, until under budget"""
+        if self.budget is None:
+            return
+        total = sum(entry.nbytes for entry in self._entries.values())
+        if total <= self.budget.photo_bytes:
+            return
+        
+        now = time.monotonic()
+        hidden = []
+        for key, entry in self._entries.items():
+            if key == keep:
+                continue
+            if any(self._is_viewable(name) for name in entry.holders):
+                entry.last_visible = now
+            else:
+                hidden.append((entry.last_visible, key))
+        
+        for _, key in sorted(hidden):
+            if total <= self.budget.photo_bytes:
+                break
+            total -= self._evict(key)
+
+    def _evict(self, key: Tuple[str, int, int]) -> int:
+        """Take an image off all its widgets and free it; returns the bytes freed"""
+        entry = self._entries.pop(key)
+        for name in entry.holders:
+            widget = self._widgets.get(name)
+            self._held.pop(name, None)
+            self._evicted[name] = key
+            show = self._show.get(name)
+            if show is not None:
+                show(None)  # Also drops the reference its owner keeps
+            elif widget is not None:
+                widget.configure(image="")
+                if hasattr(widget, "image"):
+                    widget.image = None  # type: ignore  # Drop the reference kept by shared_image users
+        self.evictions += 1
+        return entry.nbytes
+
+    def _is_viewable(self, name: str) -> bool:
+        """Check whether a holder widget is currently visible on screen"""
+        widget = self._widgets.get(name)
+        try:
+            return bool(widget and widget.winfo_viewable())
+        except tk.TclError:
+            return False
+
+    def _on_visible(self, name: str) -> None:
+        """Render an evicted image again, or refresh the visibility time of a held one"""
+        key = self._evicted.get(name)
+        if key is None:
+            entry = self._entries.get(self._held.get(name))  # type: ignore
+            if entry is not None:
+                entry.last_visible = time.monotonic()
+            return
+        widget = self._widgets[name]
+        show = self._show.get(name) or (lambda photo: self._show_on_widget(widget, photo))
+        if self.scheduler is not None:
+            # Draft first and resize on the worker, like any other resize
+            self.scheduler.schedule(widget, *key, show)
+        else:
+            show(self.assign(widget, *key))
+
+    @staticmethod
+    def _show_on_widget(widget: tk.Widget, photo: Optional[ImageTk.PhotoImage]) -> None:
+        """Show photo on a widget that keeps its image in widget.image"""
+        widget.configure(image=photo or "")
+        widget.image = photo  # type: ignore  # Keep reference to prevent garbage collection
+
+    def _on_destroy(self, event: tk.Event, name: str) -> None:
+        """Release the widget's image when the widget itself is destroyed"""
+        if str(event.widget) != name:
+            return
+        self._widgets.pop(name, None)
+        self._evicted.pop(name, None)
+        self._show.pop(name, None)
+        key = self._held.pop(name, None)
+        if key is not None:
+            self._release(key, name)
+
+    def _release(self, key: Tuple[str, int, int], name: str) -> None:
+        """Drop one widget's reference, freeing the Tk image with the last one"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry.holders.discard(name)
+        if not entry.holders:
+            del self._entries[key]
+
+
+class AssetPreloader:
+    """
+    Decodes and pre-scales the phase windows' images on a background thread
+    
+    Started once the main window has been painted, so the first NIGHT or
+    DAY window finds its images already in the cache.
+    
+    Args:
+        cache: Image cache the warmed images are stored in
+        assets: (path, (width, height)) pairs to warm up, in order
+    """
+    
+    PAUSE_SECONDS = 0.05  # Yield between images to keep the UI responsive
+    
+    def __init__(self, cache: ImageCache, assets: List[Tuple[str, Tuple[int, int]]]) -> None:
+        self.cache = cache
+        self.assets = assets
+        self._thread: Optional[threading.Thread] = None
+        self.done = threading.Event()
+
+    def start(self) -> None:
+        """Start warming up, unless it has already been started"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="asset-preloader", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        """Warm every asset, skipping the ones that fail to load"""
+        for path, (width, height) in self.assets:
+            try:
+                self.cache.get_resized(path, width, height)
+            except OSError as e:
+                print(f"Error preloading {path}: {e}")
+            time.sleep(self.PAUSE_SECONDS)
+        self.done.set()
+
+
+class ResizeScheduler:
+    """
+    Coalesces bursts of <Configure> events and resamples images off the Tk thread
+    
+    While events keep arriving, the widget shows cheap draft-quality resizes of
+    an already decoded image. Once the size has settled, only that last size
+    is resampled at final quality, on a single worker thread. The finished
+    image is turned into a PhotoImage on the Tk thread.
+    
+    Args:
+        cache: Image cache the worker reads decoded and resized images from
+        registry: Registry the finished images are shared through
+    """
+    
+    DELAY_MS = 80           # Quiet period before the final resize is started
+    POLL_MS = 15            # How often the Tk thread checks for finished resizes
+    DRAFT_INTERVAL_MS = 40  # Minimum time between two drafts for one widget
+    
+    def __init__(self, cache: ImageCache, registry: PhotoImageRegistry) -> None:
+        self.cache = cache
+        self.registry = registry
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-resize")
+        self._results: "queue.Queue[tuple]" = queue.Queue()
+        self._pending: Dict[str, str] = {}      # widget name -> after() id
+        self._generation: Dict[str, int] = {}   # widget name -> latest request
+        self._last_draft: Dict[str, float] = {} # widget name -> time of last draft
+        self._in_flight = 0
+        self._polling = False
+
+    def schedule(self, widget: tk.Widget, path: str, width: int, height: int,
+                 on_ready: Callable[[ImageTk.PhotoImage], None]) -> None:
+        """Request path resized to (width, height) for widget, superseding older requests"""
+        key = str(widget)
+        after_id = self._pending.pop(key, None)
+        if after_id:
+            widget.after_cancel(after_id)
+        
+        generation = self._generation.get(key, 0) + 1
+        self._generation[key] = generation
+        
+        if not self.registry.holds(widget):
+            # First image for this widget: show it at once if it is already prepared
+            image = self.cache.peek_resized(path, width, height)
+            if image is not None or self.registry.get(path, width, height) is not None:
+                on_ready(self.registry.assign(widget, path, width, height, image, on_ready))
+                return
+        
+        self._show_draft(widget, key, path, width, height, on_ready)
+        self._pending[key] = widget.after(
+            self.DELAY_MS, self._submit, widget, key, generation, path, width, height, on_ready
+        )
+
+    def _show_draft(self, widget: tk.Widget, key: str, path: str, width: int, height: int,
+                    on_ready: Callable) -> None:
+        """Show a draft-quality image right away, at most every DRAFT_INTERVAL_MS"""
+        now = time.perf_counter()
+        if (now - self._last_draft.get(key, 0.0)) * 1000 < self.DRAFT_INTERVAL_MS:
+            return
+        if width <= 1 or height <= 1:
+            return  # Widget not laid out yet
+        image = self.cache.draft(path, width, height)
+        if image is not None:
+            self._last_draft[key] = now
+            on_ready(ImageTk.PhotoImage(image))
+
+    def _submit(self, widget: tk.Widget, key: str, generation: int, path: str,
+                width: int, height: int, on_ready: Callable) -> None:
+        """Hand the settled size to the worker thread"""
+        self._pending.pop(key, None)
+        self._last_draft.pop(key, None)
+        if not widget.winfo_exists():
+            self._generation.pop(key, None)
+            return
+        if self.registry.get(path, width, height) is not None:
+            # Another widget already shows this image; share it right away
+            on_ready(self.registry.assign(widget, path, width, height, on_ready=on_ready))
+            return
+        
+        future = self._executor.submit(self.cache.get_resized, path, width, height)
+        future.add_done_callback(
+            lambda f: self._results.put((widget, key, generation, f, on_ready, path, width, height))
+        )
+        self._in_flight += 1
+        if not self._polling:
+            self._polling = True
+            widget.nametowidget(".").after(self.POLL_MS, self._poll, widget.nametowidget("."))
+
+    def _poll(self, root: tk.Misc) -> None:
+        """
+        Deliver finished resizes to their widgets on the Tk thread
+        
+        A failed resize or delivery is logged and skipped; polling goes on
+        so later resizes still arrive.
+        """
+        while True:
+            try:
+                (widget, key, generation, future, on_ready,
+                 path, width, height) = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._in_flight -= 1
+            
+            if generation != self._generation.get(key):
+                continue  # A newer size was requested meanwhile
+            try:
+                exists = widget.winfo_exists()
+            except tk.TclError:
+                exists = False
+            if not exists:
+                self._generation.pop(key, None)
+                continue
+            try:
+                image = future.result()
+                on_ready(self.registry.assign(widget, path, width, height, image, on_ready))
+            except OSError as e:
+                print(f"Error resizing image: {e}")
+            except tk.TclError as e:  # e.g. the widget was destroyed meanwhile
+                print(f"Error showing resized image: {e}")
+            except Exception as e:
+                print(f"Unexpected error delivering resized image {path}: {e!r}")
+        
+        if self._in_flight > 0:
+            root.after(self.POLL_MS, self._poll, root)
+        else:
+            self._polling = False
 
 
 class Utilities:
     """Utility functions for window management and UI helpers"""
     
     def __init__(self) -> None:
-        self.db = Database()
-        self.nd_helper = self.db.Night_Day_Helper()
+        self.sessions = SessionManager()
+        self.image_budget = ImageMemoryBudget()
+        self.image_cache = ImageCache(
+            pyramid=AssetPyramid(), pixel_cache=PixelCache(), budget=self.image_budget
+        )
+        self.button_atlas = ButtonAtlas(self.image_cache)
+        self.photo_registry = PhotoImageRegistry(self.image_cache, self.image_budget)
+        self.resize_scheduler = ResizeScheduler(self.image_cache, self.photo_registry)
+        self.photo_registry.scheduler = self.resize_scheduler
+        self.asset_preloader = AssetPreloader(self.image_cache, WARMUP_ASSETS)
+
+    @property
+    def engine(self) -> GameEngine:
+        """Engine of the game the UI is currently bound to"""
+        return self.sessions.current.engine
+
+    @property
+    def db(self):
+        """Players and roles of the current game"""
+        return self.engine.db
+
+    @property
+    def nd_helper(self):
+        """Night and day state of the current game"""
+        return self.engine.helper
+
+    def reset_game(self) -> None:
+        """Discard the selected game's state and start it over"""
+        self.engine.reset()
 
     def zoom_control(self, window: tk.Tk, event: Optional[tk.Event] = None) -> None:
         """Toggle window between zoomed and normal state"""
@@ -40,29 +947,142 @@ class Utilities:
 
     def photoimage_generator(self, path: str) -> ImageTk.PhotoImage:
         """Generate PhotoImage from file path"""
-        return ImageTk.PhotoImage(Image.open(path))
+        return ImageTk.PhotoImage(self.image_cache.get_source(path))
 
     def resize_image(self, path: str, width: int, height: int) -> ImageTk.PhotoImage:
         """Resize image and return as PhotoImage"""
-        image = Image.open(path).resize((width, height))
+        image = self.image_cache.get_resized(path, width, height)
         return ImageTk.PhotoImage(image)
+
+    def shared_image(self, widget: tk.Widget, path: str, width: int, height: int) -> ImageTk.PhotoImage:
+        """Resize image and return the PhotoImage shared by every widget showing it at that size"""
+        return self.photo_registry.assign(widget, path, width, height)
     
+    def image_memory_report(self) -> Dict[str, object]:
+        """
+        Get the current image memory footprint
+        
+        Returns:
+            Dict with the bytes held by the image cache and by Tk images,
+            their budgets, and the cache and registry statistics
+        """
+        cache = self.image_cache.stats()
+        photos = self.photo_registry.stats()
+        cache_bytes = sum(cache["bytes"].values())  # type: ignore
+        return {
+            "cache_bytes": cache_bytes,
+            "photo_bytes": photos["bytes"],
+            "total_bytes": cache_bytes + photos["bytes"],
+            "cache_budget": self.image_budget.cache_bytes,
+            "photo_budget": self.image_budget.photo_bytes,
+            "cache": cache,
+            "photos": photos,
+        }
+
+    def button_images(self, name: str) -> Tuple[Image.Image, Image.Image]:
+        """
+        Get the (normal, pressed) frames of a button from BUTTON_SPRITES
+        
+        Frames come pre-sized from the sprite atlas when it has been built,
+        otherwise they are read from the button's own PNG files.
+        """
+        folder, size = BUTTON_SPRITES[name]
+        frames = self.button_atlas.frames(name, size)
+        if frames is None:
+            frames = (
+                Image.open(os.path.join(folder, "frame_1.png")),
+                Image.open(os.path.join(folder, "frame_2.png")),
+            )
+        return frames
+
     def initialize_windows(self, window) -> None:
         """Initialize window with default size, position, and key bindings"""
-        width, height = 1100, 650
+        width, height = WINDOW_WIDTH, WINDOW_HEIGHT
         x, y = self.calculate_x_y(width, height, window)
         window.geometry(f"{width}x{height}+{x}+{y}")
         window.bind("<Escape>", lambda event: self.zoom_control(window, event))
 
+    def drop_eliminated_options(self, combobox) -> None:
+        """Remove players from a player combobox's options as they are eliminated"""
+        def on_elimination(topic: str, data: dict) -> None:
+            eliminated = data["player"].lower()
+            values = [value for value in combobox.cget("values") if value.lower() != eliminated]
+            combobox.configure(values=values)
+        
+        self.engine.bus.subscribe_widget(combobox, EventType.ELIMINATION, on_elimination)
+
+    def bind_history_keys(self, window: tk.Toplevel, master: tk.Misc) -> None:
+        """
+        Bind Ctrl+Z to undo and Ctrl+Y / Ctrl+Shift+Z to redo in a phase window
+        
+        The window is rebuilt after each step so every widget shows the
+        restored state; it becomes the Day window or the Night window
+        depending on where the restored game is.
+        """
+        def step(undo: bool) -> str:
+            changed = self.engine.undo() if undo else self.engine.redo()
+            if changed:
+                self._reopen_phase_window(window, master)
+            return "break"
+        
+        window.bind("<Control-z>", lambda event: step(True))
+        window.bind("<Control-y>", lambda event: step(False))
+        window.bind("<Control-Z>", lambda event: step(False))
+
+    def _reopen_phase_window(self, window: tk.Toplevel, master: tk.Misc) -> None:
+        """Replace a phase window with a fresh one for the current game state"""
+        from button_commands import load_window
+        
+        window.grab_release()
+        window.destroy()
+        in_day = self.nd_helper.night_number > self.nd_helper.day_number
+        load_window("day" if in_day else "night").create_window(master)
+
+    def show_token_budget(self, label, tokens: int, normal_color: str) -> None:
+        """Show a prompt's token count against the context budget, colored as it nears the budget"""
+        usage = token_estimator.budget_usage(tokens)
+        if usage > 1:
+            color = "#FF2A2A"
+        elif usage >= token_estimator.BudgetConfig.WARN_RATIO:
+            color = "orange"
+        else:
+            color = normal_color
+        label.configure(text=token_estimator.budget_text(tokens), text_color=color)
+
+    def export_prompts(self, window: tk.Misc, phase: str,
+                       overrides: Optional[Dict[str, str]] = None) -> None:
+        """Ask where to save, then write every living player's prompt for phase to one bundle"""
+        path = filedialog.asksaveasfilename(
+            parent=window,
+            title="Export prompts",
+            defaultextension=".jsonl",
+            filetypes=prompt_bundle.BUNDLE_FILETYPES,
+            initialfile=f"{phase}-prompts.jsonl"
+        )
+        if not path:
+            return
+        try:
+            count = prompt_bundle.export(self.engine, path, phase, overrides)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Export Failed", str(e), parent=window)
+            return
+        messagebox.showinfo("Exported", f"{count} prompts written to {path}", parent=window)
+
     def image_config(self, event: tk.Event, label: tk.Label, 
                     last_size: dict, img_path: str) -> None:
         """Handle image resize on window configure event"""
         if event.width != last_size['width'] or event.height != last_size['height']:
             last_size['width'] = event.width
             last_size['height'] = event.height
-            image = self.resize_image(img_path, event.width, event.height)
-            label.config(image=image)
-            label.image = image  # type: ignore  # Keep reference to prevent garbage collection
+            self.resize_scheduler.schedule(
+                label, img_path, event.width, event.height,
+                lambda image: self._set_label_image(label, image)
+            )
+
+    def _set_label_image(self, label: tk.Label, image: Optional[ImageTk.PhotoImage]) -> None:
+        """Show a resized image on a label (None clears it)"""
+        label.config(image=image or "")
+        label.image = image  # type: ignore  # Keep reference to prevent garbage collection
 
     class Custom_Buttons:
         """
@@ -81,8 +1101,11 @@ class Utilities:
                     pressed_image: Image.Image, size: Optional[Tuple[int, int]] = None,
                     command: Optional[Callable] = None, bg: Optional[str] = None) -> None:
             if size:
-                normal_image = normal_image.resize(size)
-                pressed_image = pressed_image.resize(size)
+                # Frames cut from the sprite atlas already have the right size
+                if normal_image.size != tuple(size):
+                    normal_image = normal_image.resize(size)
+                if pressed_image.size != tuple(size):
+                    pressed_image = pressed_image.resize(size)
             
             self.bg = bg or "#2A332A"
             self.master = master
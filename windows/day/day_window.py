@@ -2,6 +2,9 @@ import tkinter as tk
 from tkinter import messagebox
 import customtkinter as ctk
 from utils import utils
+from journal import EventType
+from token_estimator import count_tokens, estimate
+from windows.prompts.templates import DAY_ACTIONS, compiled_prompts, day_prompt_values, render_day_prompt
 from typing import Dict, List, Tuple, Optional, Callable
 from dataclasses import dataclass, field
 from windows.prompts.prompts_window import ImageFrame, HoverEffects
@@ -42,6 +45,8 @@ class StyleConfig:
     COMBO_RADIUS: int = 15
     COMBO_TEXT_SIZE: int = 22
 
+    PREVIEW_LENGTH: int = 130
+
     def __post_init__(self) -> None:
         """Calculate relative y positions and heights for frames based on FRAME_RATIO"""
         try:
@@ -85,6 +90,7 @@ class DayPhaseWindow:
         self.interaction_frame.day_window = self
 
         self._setup_window_ui()
+        utils.bind_history_keys(self.window, self.master)
 
     def _setup_window_ui(self):
         self._create_image_frames()
@@ -100,22 +106,6 @@ class DayPhaseWindow:
         self.interaction_frame.selection_frame_ref = self.selection_frame
         self.interaction_frame.footer_frame_ref = self.footer_frame
 
-    def _refresh_player_dropdowns(self):
-        """Refresh player dropdowns after elimination"""
-        if self.interaction_frame.selection_frame_ref:
-            active_players = [
-                name for name in self.interaction_frame.players_list 
-                if name not in utils.db.eliminated_players
-            ]
-            self.interaction_frame.selection_frame_ref.player_combobox.configure(values=active_players)
-        
-        if self.interaction_frame.footer_frame_ref:
-            votable_players = [
-                name for name in self.interaction_frame.players_list 
-                if name not in utils.db.eliminated_players
-            ]
-            self.interaction_frame.footer_frame_ref.interaction.vote_combobox.configure(values=votable_players) #type: ignore
-
     def _create_window(self):
         window = tk.Toplevel(self.master)
         window.title("Day Phase")
@@ -213,17 +203,13 @@ class InteractionFrame(FrameBase):
         self.dialogue_vote_var = tk.StringVar()
 
         self.players_list = [x for x, _ in utils.db.players_list]
-        self.day_prompts_dict = utils.db.prompts["day"]
-        self.actual_prompt = self.day_prompts_dict["prompt"]
-        self.placeholders = self.day_prompts_dict["placeholders"]
 
-        self.phase_actions = [
-            "Discuss: In one or two lines discuss your thoughts to others (speakers after you can see it in Phase 1),", 
-            "Vote: In just one word vote out a player you suspect"
-        ]
+        self.phase_actions = DAY_ACTIONS
         self.current_action = self.phase_actions[self.day_phase - 1]
-        self.current_prompt = ""
+        self.current_prompt: str|None = None  # None: the day prompt, rendered when copied
         self.prompt_var = tk.StringVar()
+        self.token_label: ctk.CTkLabel|None = None
+        self._token_key: Tuple|None = None  # What the shown token count was estimated for
 
         self.player_var = tk.StringVar(value=f"{self.players_list[0]}")
         self.phase_var = tk.StringVar(value=f"Phase {self.day_phase}")
@@ -245,6 +231,9 @@ class InteractionFrame(FrameBase):
         self.window_destroying = False
 
         self._update_prompt()
+        # Keep the prompt preview in step with the recorded dialogues
+        for topic in (EventType.DIALOGUE, EventType.CLEARED):
+            utils.engine.bus.subscribe_widget(self.master, topic, lambda topic, data: self._update_prompt())
 
     def _on_phase_change(self, current_phase: str):
 
@@ -255,16 +244,17 @@ class InteractionFrame(FrameBase):
         def set_phase_db(phase_str: str):
             try:
                 phase_num = int(phase_str.split()[-1])
-                utils.nd_helper.day_phase = phase_num
+                utils.engine.set_phase("day", phase_num)
             except (ValueError, IndexError):
                 messagebox.showerror("Error", f"Invalid phase selection: {phase_str}")
 
-        set_first_player()
-        set_phase_db(current_phase)
-        self._update_prompt()
-        self._place_dialogue_vote()
-        utils.nd_helper.clear_dialogues()
-        utils.nd_helper.clear_votes()
+        with utils.engine.batch():  # One undo step for the whole phase switch
+            set_first_player()
+            set_phase_db(current_phase)
+            self._update_prompt()
+            self._place_dialogue_vote()
+            utils.engine.clear("dialogues")
+            utils.engine.clear("votes")
 
     def _on_player_change(self, _: str|None=None):
         self._update_prompt()
@@ -273,11 +263,40 @@ class InteractionFrame(FrameBase):
     def _update_prompt(self):
         self.day_phase = int((self.phase_var.get()).split()[-1])
         self.current_action = self.phase_actions[self.day_phase - 1]
-        self.current_prompt = self.actual_prompt.replace(self.placeholders["day_number"], str(self.day_number)
-            ).replace(self.placeholders["phase_number"], str(self.day_phase)
-            ).replace(self.placeholders["current_action"], self.current_action
-            ).replace(self.placeholders["dialogues"], utils.nd_helper.get_dialogues())
-        self.prompt_var.set(self.current_prompt[:130] + "..." if len(self.current_prompt) > 130 else self.current_prompt)
+        self.current_prompt = None
+        # Only the start of the transcript can show in the preview
+        head = self._render_prompt(utils.nd_helper.transcript.head(self.style.PREVIEW_LENGTH))
+        self._set_preview(head)
+        self._update_token_count()
+
+    def _render_prompt(self, dialogues: str) -> str:
+        return render_day_prompt(self.day_number, self.day_phase, dialogues)
+
+    def _full_prompt(self) -> str:
+        if self.current_prompt is not None:
+            return self.current_prompt
+        return self._render_prompt(utils.nd_helper.get_dialogues())
+
+    def _update_token_count(self) -> None:
+        if not self.token_label:
+            return
+        transcript = utils.nd_helper.transcript
+        key = (self.current_prompt, self.day_number, self.day_phase, transcript.version)
+        if key == self._token_key:
+            return
+        self._token_key = key
+        
+        if self.current_prompt is not None:
+            tokens = count_tokens(self.current_prompt)
+        else:
+            # The transcript keeps its own running token count, so nothing is joined or recounted
+            values = day_prompt_values(self.day_number, self.day_phase, "")
+            tokens = estimate(compiled_prompts()["day"], {"dialogues": transcript.token_count()}, **values)
+        utils.show_token_budget(self.token_label, tokens, self.style.TEXT_COLOR)
+
+    def _set_preview(self, prompt: str) -> None:
+        length = self.style.PREVIEW_LENGTH
+        self.prompt_var.set(prompt[:length] + "..." if len(prompt) > length else prompt)
 
     def _place_dialogue_vote(self) -> None:
         if self.vote_combobox and self.dialogue_entry:
@@ -293,40 +312,25 @@ class InteractionFrame(FrameBase):
                 self.vote_combobox.place(relx=0.3, rely=0.2, relwidth=0.4, relheight=0.6)
 
     def _on_entering_dialogue(self, dialogue: str):
-        utils.nd_helper.add_dialogue(self.player_var.get(), dialogue)
+        utils.engine.day_dialogue(self.player_var.get(), dialogue)
         if self.dialogue_entry:  # ✅ Check before access
             self.dialogue_entry.delete(0, tk.END)
-        self._update_prompt()
 
     def _on_voting(self, votee: str):
-        utils.nd_helper.add_vote(votee)
+        # Re-voting replaces the current player's previous vote
+        utils.engine.day_vote(self.player_var.get(), votee)
 
     def _copy_to_clipboard(self):
-        prompt_text = self.current_prompt
+        prompt_text = self._full_prompt()
         self.master.clipboard_clear()
         self.master.clipboard_append(prompt_text)
         self.master.update()  # now it stays on the clipboard after the window is closed
 
     def _check_died(self):
-        
-        utils.nd_helper.clear_votes()
-        utils.nd_helper.clear_dialogues()
-
-        results = utils.nd_helper.most_voted()
-        self.player_died = results[0]
-        self.died_reason = results[1]
-
-        # Remove dead player if any
-        if self.player_died:
-            found_index = None
-            for index, value in enumerate(utils.db.players_list):
-                if value[0].lower() == self.player_died.lower():
-                    found_index = index
-                    break
-            if found_index is not None:
-                utils.db.players_list.pop(found_index)
-                utils.db.eliminated_players.append(self.player_died)
-            utils.db.calculate_left()
+
+        result = utils.engine.resolve_day()
+        self.player_died = result.eliminated
+        self.died_reason = result.reason
 
         self.current_prompt = f"""## Day Results
 - **Day Number :** {self.day_number}
@@ -334,36 +338,26 @@ class InteractionFrame(FrameBase):
 - **Reason :** {self.died_reason}"""
 
         # Check win condition (same core logic as night)
-        win_dict = utils.db.check_win()
-        for k, v in win_dict.items():
-            if v:
-                if 'mafia' in k:
-                    winner = 'Mafia'
-                    reason = 'Mafias have gained the majority!'
-                else:
-                    winner = 'Town'
-                    reason = 'All Mafias have been eliminated'
-
-                messagebox.showinfo("GAME ENDS", f"{'Mafia' if 'mafia' in k else 'Town'} WON!") 
-
-                # Build final prompt (same style as night)
-                self.current_prompt = f"""# GAME ENDED
-- **Winner :** {winner}
-- **Reason :** {reason}"""
-
-                # Copy final result to clipboard
-                self._copy_to_clipboard()
-
-                # Reset global state and close this window
-                self.master.grab_release()
-                self.master.transient(None)
-                utils.db.reset_values()
-                utils.nd_helper = utils.db.Night_Day_Helper()
-                self.window_destroying = True
-                self.master.after(200, self.master.destroy)
-
-                # IMPORTANT: stop any further day-phase UI logic
-                return
+        if result.game_over:
+            messagebox.showinfo("GAME ENDS", f"{result.winner} WON!")
+
+            # Build final prompt (same style as night)
+            self.current_prompt = f"""# GAME ENDED
+- **Winner :** {result.winner}
+- **Reason :** {result.win_reason}"""
+
+            # Copy final result to clipboard
+            self._copy_to_clipboard()
+
+            # Reset global state and close this window
+            self.master.grab_release()
+            self.master.transient(None)
+            utils.reset_game()
+            self.window_destroying = True
+            self.master.after(200, self.master.destroy)
+
+            # IMPORTANT: stop any further day-phase UI logic
+            return
             
     def _next_button_click(self, event=None):
         curr_player = self.player_var.get()
@@ -399,8 +393,7 @@ class InteractionFrame(FrameBase):
                     return
 
                 # No win: proceed with normal day results
-                if self.day_window:
-                    self.day_window._refresh_player_dropdowns()
+                # (player dropdowns drop the eliminated player themselves)
                 if self.night_button:
                     self.night_button.place(relx=0.72, rely=0.2, relwidth=0.11, relheight=0.6)
 
@@ -419,9 +412,8 @@ class InteractionFrame(FrameBase):
 - **Player Died :** {self.player_died}
 - **Reason :** {self.died_reason}"""
                 
-                self.prompt_var.set(
-    self.current_prompt[:130] + "..." if len(self.current_prompt) > 130 else self.current_prompt
-)
+                self._set_preview(self.current_prompt)
+                self._update_token_count()
 
             else:
                 # Regular player in phase 2, move to next player
@@ -432,10 +424,7 @@ class InteractionFrame(FrameBase):
 
 
     def _night_button_click(self, event=None):
-        utils.nd_helper.clear_votes()
-        utils.nd_helper.clear_dialogues()
-
-        utils.nd_helper.day_number += 1
+        utils.engine.end_day()
         create_night_window(self.root)
 
         self.master.grab_release()
@@ -476,13 +465,14 @@ class SelectionFrame(FrameBase):
         # Filter out eliminated players
         player_options = [
             name for name in self.interaction.players_list 
-            if name not in utils.db.eliminated_players
+            if not utils.db.is_eliminated(name)
         ]
         check_options("players", player_options)
 
         self.player_combobox = self._create_combobox(self.selection_frame, self.interaction.player_var, player_options)
         self.player_combobox.place(relx=0.05, rely=rely, relwidth=0.4, relheight=relheight)
         self.player_combobox.configure(command=self.interaction._on_player_change)
+        utils.drop_eliminated_options(self.player_combobox)
 
 
         phase_options = [f"Phase {i}" for i in range(1, 3)]
@@ -506,6 +496,8 @@ class PromptFrame(FrameBase):
         self._create_prompt_frame()
         self._setup_prompt_label()
         self._create_copy_button()
+        self._create_export_button()
+        self._create_token_label()
 
     def _create_prompt_frame(self):
         self.prompt_frame = self._create_frames(self.parent, self.rely, self.relheight)
@@ -554,6 +546,37 @@ class PromptFrame(FrameBase):
         )
         self.copy_button.place(relx=0.85, rely=0.7, relwidth=0.1, relheight=0.25)
 
+    def _create_token_label(self):
+        self.interaction.token_label = ctk.CTkLabel(
+            self.prompt_frame,
+            text="",
+            font=(self.style.FONT_FAMILY, self.style.TEXT_SIZE_SMALL - 4, "bold"),
+            text_color=self.style.TEXT_COLOR,
+            bg_color="transparent",
+            anchor="w"
+        )
+        self.interaction.token_label.place(relx=0.1, rely=0.03, relwidth=0.73, relheight=0.1)
+        self.interaction._update_token_count()
+
+    def _create_export_button(self):
+        self.export_button = ctk.CTkButton(
+            self.prompt_frame,
+            text="💾",
+            font=(self.style.FONT_FAMILY, self.style.TEXT_SIZE+2, "bold"),
+            fg_color=self.style.FG_COLOR,
+            bg_color=self.style.BG_COLOR_FRAME,
+            border_width=self.style.BORDER_WIDTH,
+            border_color=self.style.BD_COLOR,
+            corner_radius=self.style.CORNER_RADIUS,
+            command=lambda: utils.export_prompts(self.interaction.master, "day"),
+        )
+        HoverEffects.apply_border_hover(
+            self.export_button,
+            self.style.HOVER_COLOR,
+            self.style.BD_COLOR
+        )
+        self.export_button.place(relx=0.85, rely=0.4, relwidth=0.1, relheight=0.25)
+
 
 class FooterFrame(FrameBase):
     def __init__(self, parent: tk.Frame|tk.Toplevel|ImageFrame, interaction_frame: InteractionFrame):
@@ -626,10 +649,11 @@ class FooterFrame(FrameBase):
         # Filter out eliminated players from vote options
         votable_players = [
             name for name in self.interaction.players_list 
-            if name not in utils.db.eliminated_players
+            if not utils.db.is_eliminated(name)
         ]
         self.interaction.vote_combobox = self._create_combobox(self.footer_frame, self.interaction.vote_var, votable_players)
         self.interaction.vote_combobox.configure(command=self.interaction._on_voting)
+        utils.drop_eliminated_options(self.interaction.vote_combobox)
 
     def _create_next_button(self):
         self.interaction.next_button = ctk.CTkButton(
@@ -2,6 +2,9 @@ import tkinter as tk
 from tkinter import messagebox
 import customtkinter as ctk
 from utils import utils
+from journal import EventType
+from token_estimator import count_tokens, estimate
+from windows.prompts.templates import DIALOGUES_HEADER, compiled_prompts, night_prompt_values, render_night_prompt
 from PIL import Image, ImageTk
 from typing import Dict, List, Tuple, Callable, Optional
 from dataclasses import dataclass
@@ -92,6 +95,7 @@ class RoleFrame:
         self.dialogue_entry = self._create_dialogue_entry()
         self.voted_combo = self._create_voted_combo()
         self.copy_button = self._create_copy_button()
+        self.token_label = self._create_token_label()
         self.previous_vote = None  # Track the previous vote for this role
     
     def _create_title_label(self):
@@ -173,18 +177,20 @@ class RoleFrame:
             values=values,
             command=None  # Will be set externally
         )
+        utils.drop_eliminated_options(combo)
         return combo
     
     def _get_vote_values(self) -> List[str]:
         """Get the list of players this role can vote for"""
         if self.name == "Mafia":
             # Mafia can only vote for non-mafia players
+            mafias = utils.db.players_with_role('mafia')
             return [name for name, _ in utils.db.players_list 
-                    if name not in utils.db.mafias_list and name not in utils.db.eliminated_players]
+                    if name not in mafias and not utils.db.is_eliminated(name)]
         else:
             # Sheriff and Doctor can vote for anyone except eliminated players
             return [name for name, _ in utils.db.players_list 
-                    if name not in utils.db.eliminated_players]
+                    if not utils.db.is_eliminated(name)]
     
     def _create_copy_button(self) -> ctk.CTkButton:
         """Create the copy to clipboard button"""
@@ -203,6 +209,21 @@ class RoleFrame:
         button.place(relx=0.1, rely=0.75, relwidth=0.1, relheight=0.15)
         return button
     
+    def _create_token_label(self) -> ctk.CTkLabel:
+        """Create the label showing the prompt's size against the context budget"""
+        label = ctk.CTkLabel(
+            self.frame,
+            text="",
+            bg_color="transparent",
+            text_color=self.style.LABEL_COLOR,
+            font=ctk.CTkFont(self.style.FONT_FAMILY, 14, "bold")
+        )
+        if self.name == "Mafia":
+            label.place(relx=0.1, rely=0.66, relwidth=0.8, relheight=0.08)
+        else:
+            label.place(relx=0.25, rely=0.77, relwidth=0.65, relheight=0.1)
+        return label
+    
     def _create_styled_combo(self, variable: tk.StringVar, values: List[str], 
                             command: Optional[Callable]) -> ctk.CTkComboBox:
         """Create a combobox with consistent styling"""
@@ -264,7 +285,7 @@ class MafiaControls:
         self.style = style
         # Filter out eliminated players from available speakers
         active_mafias = [name for name in utils.db.mafias_list 
-                if name not in utils.db.eliminated_players]
+                if not utils.db.is_eliminated(name)]
         self.player_var = tk.StringVar(value=active_mafias[0] if active_mafias else "")
         
         self._setup_ui()
@@ -275,6 +296,7 @@ class MafiaControls:
         self.player_combo = self._create_speaker_combo()
         self.next_button = self._create_next_button()
         self.day_button = self._create_done_button()
+        self.export_button = self._create_export_button()
     
     def _create_speaker_label(self):
         """Create the speaker selection label"""
@@ -291,7 +313,7 @@ class MafiaControls:
         """Create the speaker selection combobox"""
         # Filter out eliminated players from available speakers
         active_mafias = [name for name in utils.db.mafias_list 
-                        if name not in utils.db.eliminated_players]
+                        if not utils.db.is_eliminated(name)]
         combo = ctk.CTkComboBox(
             self.mafia_frame.frame,
             corner_radius=self.style.CORNER_RADIUS,
@@ -344,6 +366,21 @@ class MafiaControls:
         button.place(relx=0.25, rely=0.75, relwidth=0.25, relheight=0.15)
         button.place_forget()  # Hide initially
         return button
+    
+    def _create_export_button(self) -> ctk.CTkButton:
+        """Create the button exporting every player's night prompt"""
+        button = ctk.CTkButton(
+            self.mafia_frame.frame,
+            text="💾",
+            command=None,  # Will be set externally
+            fg_color="transparent",
+            border_color="steelblue",
+            text_color=self.style.TEXT_COLOR,
+            border_width=3,
+            font=(self.style.FONT_FAMILY, self.style.BUTTON_FONT_SIZE, "bold")
+        )
+        button.place(relx=0.525, rely=0.75, relwidth=0.1, relheight=0.15)
+        return button
 
 
 class NightPhaseWindow:
@@ -377,7 +414,7 @@ class NightPhaseWindow:
     
     def _setup_window(self):
         """Setup window-specific configurations"""
-        pass
+        utils.bind_history_keys(self.window, self.master)
     
     def _setup_background_frames(self):
         """Setup the title and body background frames"""
@@ -465,38 +502,46 @@ class NightPhaseWindow:
         
         # Mafia-specific handlers
         self.mafia_controls.next_button.configure(command=self._on_next_click)
+        self.mafia_controls.export_button.configure(command=self._export_prompts)
+        
+        # Prompt sizes follow the dialogues and the phase
+        for topic in (EventType.DIALOGUE, EventType.CLEARED, EventType.PHASE):
+            utils.engine.bus.subscribe_widget(
+                self.window, topic, lambda topic, data: self._update_token_counts()
+            )
         self.mafia_controls.day_button.configure(command=self._on_day_click)
     
     def _on_phase_change(self, event: str):
         """Handle phase change event"""
-        if '1' in event:
-            utils.nd_helper.night_phase = 1
-            self.mafia_controls.next_button.configure(
-                text="NEXT",
-                command=self._on_next_click,
-                fg_color="steelblue",
-                border_color="blue",
-                text_color=self.style.TEXT_COLOR,
-                border_width=3,
-                font=(self.style.FONT_FAMILY, self.style.BUTTON_FONT_SIZE, "bold")
-            )
-            utils.nd_helper.clear_votes()
-
-            # Hide day button in phase 1
-            if self.mafia_controls.day_button.winfo_ismapped():
-                self.mafia_controls.day_button.place_forget()
-        elif '2' in event:
-            utils.nd_helper.night_phase = 2
-            if len(utils.db.mafias_list) == 1:
+        with utils.engine.batch():  # One undo step for the whole phase switch
+            if '1' in event:
+                utils.engine.set_phase("night", 1)
                 self.mafia_controls.next_button.configure(
-                    text="CHECK!",
-                    fg_color="green",
-                    border_color="lightgreen",
-                    hover_color="darkgreen",
-                    command=self._check_died
+                    text="NEXT",
+                    command=self._on_next_click,
+                    fg_color="steelblue",
+                    border_color="blue",
+                    text_color=self.style.TEXT_COLOR,
+                    border_width=3,
+                    font=(self.style.FONT_FAMILY, self.style.BUTTON_FONT_SIZE, "bold")
                 )
+                utils.engine.clear("votes")
 
-                utils.nd_helper.clear_dialogues()
+                # Hide day button in phase 1
+                if self.mafia_controls.day_button.winfo_ismapped():
+                    self.mafia_controls.day_button.place_forget()
+            elif '2' in event:
+                utils.engine.set_phase("night", 2)
+                if len(utils.db.mafias_list) == 1:
+                    self.mafia_controls.next_button.configure(
+                        text="CHECK!",
+                        fg_color="green",
+                        border_color="lightgreen",
+                        hover_color="darkgreen",
+                        command=self._check_died
+                    )
+
+                    utils.engine.clear("dialogues")
         
         # Update all role frames
         for role_frame in self.role_frames.values():
@@ -516,7 +561,7 @@ class NightPhaseWindow:
         """Handle dialogue entry change"""
         speaker = self.mafia_controls.player_var.get()
         dialogue = role_frame.dialogue_var.get()
-        utils.nd_helper.add_dialogue(speaker, dialogue)
+        utils.engine.night_dialogue(speaker, dialogue)
     
     def _on_vote_change(self, role_frame: RoleFrame, new_vote: str):
         """Handle vote change - replace previous vote with new vote"""
@@ -525,25 +570,22 @@ class NightPhaseWindow:
         
         # Doctor saves instead of voting
         if role_frame.name == "Doctor":
-            utils.nd_helper.set_doctor_save(new_vote)
+            utils.engine.doctor_save(new_vote)
             role_frame.previous_vote = new_vote #type: ignore
+            return
             
         elif role_frame.name == "Sheriff":
-            self.sheriff_last_result = utils.nd_helper.investigate_result(new_vote, utils.db)
+            self.sheriff_last_result = utils.engine.investigate(new_vote)
+            self._update_token_counts()
+            messagebox.showinfo(
+                "Sheriff Investigation",
+                f"Investigated {new_vote.title()}: {self.sheriff_last_result}\nCopy Sheriff prompt to clipboard."
+            )
             return
 
-        
-        # For other roles, handle regular votes
-        # If there was a previous vote, remove it
-        if role_frame.previous_vote:
-            prev_vote_lower = role_frame.previous_vote.lower()
-            if prev_vote_lower in utils.nd_helper.votes:
-                utils.nd_helper.votes[prev_vote_lower] -= 1
-                if utils.nd_helper.votes[prev_vote_lower] <= 0:
-                    del utils.nd_helper.votes[prev_vote_lower]
-        
-        # Add the new vote
-        utils.nd_helper.add_vote(new_vote)
+        # Mafia votes: the ledger replaces the current speaker's previous vote
+        speaker = self.mafia_controls.player_var.get()
+        utils.engine.night_vote(speaker, new_vote)
         role_frame.previous_vote = new_vote # type: ignore
     
     def _on_next_click(self):
@@ -585,67 +627,28 @@ class NightPhaseWindow:
     
     def _check_died(self):
         """Check if the targeted player dies and show copy button"""
-        target = utils.nd_helper.most_voted()[0]
-
-        if target is None:
-            utils.nd_helper.change_day_message("No one")
-            message = "No one"
-        else:
-            # Check if doctor saved the target
-            died = utils.nd_helper.check_died(target)
-
-            if died:
-                # Player actually died
-                found_index = None
-                for index, value in enumerate(utils.db.players_list):
-                    if value[0].lower() == target.lower():
-                        found_index = index
-                        break
-                # must check "is not None" because index 0 is valid but falsy
-                if found_index is not None:
-                    utils.db.players_list.pop(found_index)
-                    utils.db.eliminated_players.append(target)
-                utils.db.calculate_left()
-
-                # === GAME WIN CHECK (copied from day logic) ===
-                win_dict = utils.db.check_win()
-                for k, v in win_dict.items():
-                    if v:
-                        if 'mafia' in k:
-                            winner = 'Mafia'
-                            reason = 'Mafias have gained the majority!'
-                        else:
-                            winner = 'Town'
-                            reason = 'All Mafias have been eliminated'
-                        messagebox.showinfo("GAME ENDS", f"{'Mafia' if 'mafia' in k else 'Town'} WON!")
+        result = utils.engine.resolve_night()
 
-                        final_prompt = f"""# GAME ENDED
-    - **Winner :** {winner}
-    - **Reason :** {reason}"""
+        if result.game_over:
+            messagebox.showinfo("GAME ENDS", f"{result.winner} WON!")
 
-                        # Copy final result to clipboard (optional but matches day behavior)
-                        self.window.clipboard_clear()
-                        self.window.clipboard_append(final_prompt)
-                        self.window.update()
+            final_prompt = f"""# GAME ENDED
+    - **Winner :** {result.winner}
+    - **Reason :** {result.win_reason}"""
 
-                        # Reset global state and close window
-                        self.window.grab_release()
-                        self.window.transient(None)
-                        utils.db.reset_values()
-                        utils.nd_helper = utils.db.Night_Day_Helper()
-                        self.window.after(200, self.window.destroy)
-                        return
-                # === END GAME WIN CHECK ===
+            # Copy final result to clipboard (optional but matches day behavior)
+            self.window.clipboard_clear()
+            self.window.clipboard_append(final_prompt)
+            self.window.update()
 
-                message = target
-            else:
-                # Doctor saved them
-                message = "No one"
-
-            utils.nd_helper.change_day_message(message)
-            utils.nd_helper.clear_dialogues()
-            utils.nd_helper.clear_votes()
+            # Reset global state and close window
+            self.window.grab_release()
+            self.window.transient(None)
+            utils.reset_game()
+            self.window.after(200, self.window.destroy)
+            return
 
+        message = result.eliminated or "No one"
         messagebox.showinfo("Night Result", f"{message} has died tonight. Day message updated.")
 
         # Change button to copy button
@@ -667,9 +670,7 @@ class NightPhaseWindow:
         from windows.day.day_window import create_window as create_day_window
         
         # Increment night number when transitioning to day phase
-        utils.nd_helper.increment_night()
-        utils.nd_helper.clear_votes()        # <-- add
-        utils.nd_helper.clear_dialogues()
+        utils.engine.end_night()
         
         create_day_window(self.window.master) #type: ignore
         
@@ -687,10 +688,7 @@ class NightPhaseWindow:
     
     def _copy_to_clipboard(self, role: str):
         """Copy the appropriate prompt to clipboard"""
-        prompts = utils.db.prompts['night']
-        
         if role == "mafia":
-            prompt_data = prompts['mafia']
             dialogues = utils.nd_helper.get_dialogues()
         elif role == "sheriff":
             if self.sheriff_last_result:
@@ -700,49 +698,44 @@ class NightPhaseWindow:
                 self.window.update()
                 return
 
-            prompt_data = prompts['sheriff']
             dialogues = ""
         else:  # doctor
-            prompt_data = prompts['doctor']
             dialogues = ""
         
-        prompt = prompt_data['prompt']
-        placeholders = prompts['mafia']['placeholders']
-        
-        current_actions = {
-            "mafia": [
-                "Discuss who you want to eliminate in 1-2 lines for your teammates!",
-                "In just one word, select who do you want to eliminate!"
-            ],
-            "sheriff": [
-                "Explain your thoughts about who you want to investigate!",
-                "In just one word, select who do you want to investigate!"
-            ],
-            "doctor": [
-                "Explain your thoughts about who you want to save!",
-                "In just one word, select who do you want to save!"
-            ]
-        }
-        
-        updated_prompt = prompt.replace(
-            placeholders['night_number'], str(utils.nd_helper.night_number)
-        ).replace(
-            placeholders['phase_number'], str(utils.nd_helper.night_phase)
-        ).replace(
-            placeholders['current_action'],
-            current_actions[role][utils.nd_helper.night_phase - 1]
-        ).replace(
-            "[Dialogues]",
-            f"### Dialogues:\n{dialogues}"
+        updated_prompt = render_night_prompt(
+            role, utils.nd_helper.night_number, utils.nd_helper.night_phase, dialogues
         )
         
         self.window.clipboard_clear()
         self.window.clipboard_append(updated_prompt)
         self.window.update()
     
+    def _update_token_counts(self):
+        """Show each role's prompt size against the context budget"""
+        templates = compiled_prompts()['night']
+        helper = utils.nd_helper
+        for name, role_frame in self.role_frames.items():
+            role = name.lower()
+            if role == "sheriff" and self.sheriff_last_result:
+                tokens = count_tokens(self.sheriff_last_result)
+            else:
+                values = night_prompt_values(role, helper.night_number, helper.night_phase)
+                counted = None
+                if role == "mafia":
+                    # The transcript keeps its own running token count
+                    counted = {"dialogues_block": count_tokens(DIALOGUES_HEADER) + helper.transcript.token_count()}
+                tokens = estimate(templates[role], counted, **values)
+            utils.show_token_budget(role_frame.token_label, tokens, self.style.LABEL_COLOR)
+    
+    def _export_prompts(self):
+        """Export the night prompt of every living player to one bundle"""
+        overrides = {"sheriff": self.sheriff_last_result} if self.sheriff_last_result else None
+        utils.export_prompts(self.window, "night", overrides)
+    
     def _initialize_ui_state(self):
         """Initialize the UI to the correct state"""
         self._update_ui_for_phase()
+        self._update_token_counts()
         
         # If reopening in phase 2 with only 1 mafia, set button to CHECK
         if utils.nd_helper.night_phase == 2 and len(utils.db.mafias_list) == 1:
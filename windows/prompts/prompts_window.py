@@ -2,7 +2,9 @@ import tkinter as tk
 from tkinter import messagebox
 import customtkinter as ctk
 from utils import utils
-from typing import Dict, List
+from windows.prompts.templates import compiled_prompts, initial_prompt_values
+from token_estimator import estimate
+from typing import Dict, Optional, Tuple
 from dataclasses import dataclass
 
 
@@ -75,54 +77,38 @@ class PromptGenerator:
     def __init__(self, prompts_dict: Dict, players: Dict[str, str]):
         self.prompts_dict = prompts_dict
         self.players = players
-        self.placeholders = prompts_dict['initial']['mafia']['placeholders']
+        self._prompts: Dict[str, str] = {}
+        self._tokens: Dict[str, int] = {}
+        self._roster_key: Optional[Tuple[int, int, int]] = None
     
-    def generate_prompt(self, player_name: str) -> str:
-        """Generate initial prompt for a player"""
-        role = self.players[player_name]
-        prompt = self.prompts_dict['initial'][role]['prompt']
-        
-        # Calculate player order
-        player_order = " → ".join(self.players.keys())
-        player_list = list(self.players.keys())
-        player_index = player_list.index(player_name)
-        
-        # Replace common placeholders
-        prompt = prompt.replace(
-            self.placeholders['name'], player_name
-        ).replace(
-            self.placeholders['total_players'], str(utils.db.total_players)
-        ).replace(
-            self.placeholders['total_civilians'], 
-            str(utils.db.total_players - utils.db.total_mafias - 2)
-        ).replace(
-            self.placeholders['total_mafias'], str(utils.db.total_mafias)
-        ).replace(
-            self.placeholders['position'], str(player_index + 1)
-        ).replace(
-            self.placeholders['player_order'], player_order
-        ).replace(
-            self.placeholders['players_before'], 
-            str(player_list[:player_index])
-        ).replace(
-            self.placeholders['players_after'], 
-            str(player_list[player_index + 1:])
-        )
-        
-        # Mafia-specific placeholders
-        if role == 'mafia':
-            mafia_partners = self._get_mafia_partners(player_name)
-            prompt = prompt.replace(
-                self.placeholders['mafia_partners'], 
-                mafia_partners
-            )
-        
-        return prompt
+    def get_prompt(self, player_name: str) -> str:
+        """Get a player's initial prompt, rendering the whole roster's if it changed"""
+        self._refresh()
+        return self._prompts[player_name]
     
-    def _get_mafia_partners(self, player_name: str) -> str:
-        """Get list of mafia partners for a player"""
-        partners = [m for m in utils.db.mafias_list if m != player_name]
-        return ', '.join(partners) if partners else 'None'
+    def get_token_count(self, player_name: str) -> int:
+        """Get the estimated number of tokens in a player's initial prompt"""
+        self._refresh()
+        return self._tokens[player_name]
+    
+    def _refresh(self):
+        """Render every player's prompt again if the roster changed since the last batch"""
+        roster_key = (utils.db.version, utils.db.total_players, utils.db.total_mafias)
+        if roster_key != self._roster_key:
+            self.generate_all()
+            self._roster_key = roster_key
+    
+    def generate_all(self) -> Dict[str, str]:
+        """Generate the initial prompts (and their token counts) of every player in one batch"""
+        templates = compiled_prompts()['initial']
+        self._prompts, self._tokens = {}, {}
+        for player_name, values in initial_prompt_values(
+            self.players, utils.db.total_players, utils.db.total_mafias, utils.db.mafias_list
+        ):
+            template = templates[self.players[player_name]]
+            self._prompts[player_name] = template.render(**values)
+            self._tokens[player_name] = estimate(template, **values)
+        return self._prompts
 
 
 class PlayerSelectionFrame:
@@ -222,6 +208,17 @@ class PromptDisplayFrame:
     
     def _create_widgets(self):
         """Create label and buttons"""
+        # Token budget label
+        self.token_label = ctk.CTkLabel(
+            self.frame,
+            text="",
+            fg_color='transparent',
+            text_color=self.style.TEXT_COLOR,
+            font=ctk.CTkFont("Garamond", 16, "bold"),
+            anchor="e"
+        )
+        self.token_label.place(relx=0.5, rely=0.03, relwidth=0.45, relheight=0.07)
+        
         # Prompt label
         self.label = ctk.CTkLabel(
             self.frame,
@@ -248,6 +245,19 @@ class PromptDisplayFrame:
         )
         self.copy_btn.place(relx=0.8, rely=0.8, relwidth=0.1, relheight=0.15)
         
+        # Export button
+        self.export_btn = ctk.CTkButton(
+            self.frame,
+            text="💾",
+            command=None,  # Will be set externally
+            fg_color="transparent",
+            border_color="steelblue",
+            text_color=self.style.TEXT_COLOR,
+            border_width=3,
+            font=("Garamond", 30, "bold")
+        )
+        self.export_btn.place(relx=0.1, rely=0.8, relwidth=0.1, relheight=0.15)
+        
         # Next button
         self.next_btn = ctk.CTkButton(
             self.frame,
@@ -267,6 +277,10 @@ class PromptDisplayFrame:
         preview = full_prompt[:StyleConfig.PREVIEW_LENGTH] + "..."
         self.prompt_var.set(preview)
     
+    def set_token_count(self, tokens: int):
+        """Show the prompt's estimated tokens against the context budget"""
+        utils.show_token_budget(self.token_label, tokens, self.style.TEXT_COLOR)
+    
     def get_full_prompt(self) -> str:
         """Get the full prompt text"""
         return self.full_prompt
@@ -335,20 +349,25 @@ class PromptsWindow:
     def _initialize_prompt(self):
         """Initialize the prompt for the first player"""
         first_player = self.player_names[0]
-        prompt = self.prompt_generator.generate_prompt(first_player)
+        prompt = self.prompt_generator.get_prompt(first_player)  # Renders every player's prompt
         self.display_frame.set_prompt(prompt)
+        self.display_frame.set_token_count(self.prompt_generator.get_token_count(first_player))
     
     def _setup_event_handlers(self):
         """Setup event handlers for buttons and selection"""
         self.selection_frame.set_command(self._on_player_change)
         self.display_frame.copy_btn.configure(command=self._copy_to_clipboard)
         self.display_frame.next_btn.configure(command=self._next_player)
+        self.display_frame.export_btn.configure(
+            command=lambda: utils.export_prompts(self.window, "initial")
+        )
     
     def _on_player_change(self, event=None):
         """Handle player selection change"""
         selected_player = self.selection_frame.get_selected_player()
-        prompt = self.prompt_generator.generate_prompt(selected_player)
+        prompt = self.prompt_generator.get_prompt(selected_player)
         self.display_frame.set_prompt(prompt)
+        self.display_frame.set_token_count(self.prompt_generator.get_token_count(selected_player))
     
     def _copy_to_clipboard(self):
         """Copy full prompt to clipboard"""
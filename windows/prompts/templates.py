@@ -0,0 +1,218 @@
+"""
+templates.py - Prompt templates compiled once into literal text and placeholder slots
+"""
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Tokens used in the prompt texts that aren't listed in their placeholders
+NIGHT_ALIASES = {"dialogues_block": "[Dialogues]"}  # Mafia night prompt: DIALOGUES_HEADER + transcript
+DIALOGUES_HEADER = "### Dialogues:\n"
+
+# Current action of each night role, per night phase
+NIGHT_ACTIONS = {
+    "mafia": [
+        "Discuss who you want to eliminate in 1-2 lines for your teammates!",
+        "In just one word, select who do you want to eliminate!"
+    ],
+    "sheriff": [
+        "Explain your thoughts about who you want to investigate!",
+        "In just one word, select who do you want to investigate!"
+    ],
+    "doctor": [
+        "Explain your thoughts about who you want to save!",
+        "In just one word, select who do you want to save!"
+    ]
+}
+
+# Current action per day phase
+DAY_ACTIONS = [
+    "Discuss: In one or two lines discuss your thoughts to others (speakers after you can see it in Phase 1),",
+    "Vote: In just one word vote out a player you suspect"
+]
+
+
+class CompiledTemplate:
+    """
+    A prompt split into literal text and placeholder slots
+
+    Rendering fills the slots and joins the parts once. Inserted values are
+    never scanned for placeholders again, so a player named "[NIGHT_NUMBER]"
+    shows up as-is.
+    """
+    __slots__ = ("_parts", "_slots", "keys", "_literal_tokens")
+
+    def __init__(self, text: str, placeholders: Dict[str, Optional[str]]):
+        tokens = {token: key for key, token in placeholders.items() if token}
+        self._parts: List[str] = []
+        self._slots: Dict[str, List[int]] = {}  # placeholder key -> indexes in _parts
+
+        if tokens:
+            # Longest first, so a token that contains another one wins
+            pattern = re.compile("|".join(
+                re.escape(token) for token in sorted(tokens, key=len, reverse=True)
+            ))
+            position = 0
+            for match in pattern.finditer(text):
+                self._parts.append(text[position:match.start()])
+                self._slots.setdefault(tokens[match.group()], []).append(len(self._parts))
+                self._parts.append(match.group())  # Kept if no value is given
+                position = match.end()
+            self._parts.append(text[position:])
+        else:
+            self._parts.append(text)
+        self.keys = frozenset(self._slots)
+        self._literal_tokens: Dict[Callable[[str], int], int] = {}  # token counter -> tokens of the literal text
+
+    def render(self, **values) -> str:
+        """Fill the placeholders named by values (others are left as they are)"""
+        parts = self._parts.copy()
+        for key, value in values.items():
+            indexes = self._slots.get(key)
+            if indexes:
+                value = str(value)
+                for index in indexes:
+                    parts[index] = value
+        return "".join(parts)
+
+    def token_count(self, count: Callable[[str], int], counted: Optional[Dict[str, int]] = None,
+                    **values) -> int:
+        """
+        Estimate the tokens of render(**values) with a token counter
+        
+        The literal text is counted once per counter; only the values are
+        counted on each call.
+        
+        Args:
+            count: Token counter
+            counted: Tokens of values already counted by the caller, per placeholder key
+        """
+        literal = self._literal_tokens.get(count)
+        if literal is None:
+            slot_indexes = {index for indexes in self._slots.values() for index in indexes}
+            literal = sum(count(part) for index, part in enumerate(self._parts)
+                          if index not in slot_indexes and part)
+            self._literal_tokens[count] = literal
+        
+        tokens = literal
+        counted = counted or {}
+        for key, indexes in self._slots.items():
+            if key in counted:
+                tokens += counted[key] * len(indexes)
+                continue
+            value = str(values[key]) if key in values else self._parts[indexes[0]]
+            tokens += count(value) * len(indexes)
+        return tokens
+
+
+def compile_prompts(prompts_dict: Dict) -> Dict:
+    """Compile every template of all_prompts_dict, keeping its layout"""
+    initial = {
+        role: CompiledTemplate(data['prompt'], data['placeholders'])
+        for role, data in prompts_dict['initial'].items()
+    }
+    night = {
+        role: CompiledTemplate(data['prompt'], {**data['placeholders'], **NIGHT_ALIASES})
+        for role, data in prompts_dict['night'].items()
+    }
+    day = CompiledTemplate(prompts_dict['day']['prompt'], prompts_dict['day']['placeholders'])
+    return {'initial': initial, 'night': night, 'day': day}
+
+
+@lru_cache(maxsize=1)
+def compiled_prompts() -> Dict:
+    """The compiled prompt templates, compiled the first time they're needed"""
+    from windows.prompts.all_prompts import all_prompts_dict
+    return compile_prompts(all_prompts_dict)
+
+
+def render_initial(role: str, **values) -> str:
+    """Render a player's initial role prompt"""
+    return compiled_prompts()['initial'][role].render(**values)
+
+
+def render_night(role: str, **values) -> str:
+    """Render a role's night prompt"""
+    return compiled_prompts()['night'][role].render(**values)
+
+
+def render_day(**values) -> str:
+    """Render the day prompt"""
+    return compiled_prompts()['day'].render(**values)
+
+
+def initial_prompt_values(players: Dict[str, str], total_players: int, total_mafias: int,
+                          mafias: List[str]) -> Iterator[Tuple[str, Dict]]:
+    """
+    Placeholder values of every player's initial prompt
+    
+    Args:
+        players: Role of each player, in speaking order
+        total_players: Players the game started with
+        total_mafias: Mafias the game started with
+        mafias: Names of the mafias
+    
+    Returns:
+        (player, values) pairs in speaking order
+    """
+    player_list = list(players.keys())
+    shared = {
+        'total_players': total_players,
+        'total_civilians': total_players - total_mafias - 2,
+        'total_mafias': total_mafias,
+        'player_order': " → ".join(player_list),
+    }
+    for index, player_name in enumerate(player_list):
+        values = {
+            **shared,
+            'name': player_name,
+            'position': index + 1,
+            'players_before': player_list[:index],
+            'players_after': player_list[index + 1:],
+        }
+        
+        # Mafia-specific placeholders
+        if players[player_name] == 'mafia':
+            partners = [m for m in mafias if m != player_name]
+            values['mafia_partners'] = ', '.join(partners) if partners else 'None'
+        
+        yield player_name, values
+
+
+def render_initial_prompts(players: Dict[str, str], total_players: int, total_mafias: int,
+                           mafias: List[str]) -> Iterator[Tuple[str, str]]:
+    """Render the initial prompt of every player in one batch; same arguments as initial_prompt_values"""
+    for player_name, values in initial_prompt_values(players, total_players, total_mafias, mafias):
+        yield player_name, render_initial(players[player_name], **values)
+
+
+def night_prompt_values(role: str, night_number: int, night_phase: int, dialogues: str = "") -> Dict:
+    """Placeholder values of a role's night prompt for the given night and phase"""
+    values = {
+        'night_number': night_number,
+        'phase_number': night_phase,
+        'dialogues_block': f"{DIALOGUES_HEADER}{dialogues}",
+    }
+    if role in NIGHT_ACTIONS:
+        values['current_action'] = NIGHT_ACTIONS[role][night_phase - 1]
+    return values
+
+
+def render_night_prompt(role: str, night_number: int, night_phase: int, dialogues: str = "") -> str:
+    """Render a role's night prompt for the given night and phase"""
+    return render_night(role, **night_prompt_values(role, night_number, night_phase, dialogues))
+
+
+def day_prompt_values(day_number: int, day_phase: int, dialogues: str) -> Dict:
+    """Placeholder values of the day prompt for the given day and phase"""
+    return {
+        'day_number': day_number,
+        'phase_number': day_phase,
+        'current_action': DAY_ACTIONS[day_phase - 1],
+        'dialogues': dialogues,
+    }
+
+
+def render_day_prompt(day_number: int, day_phase: int, dialogues: str) -> str:
+    """Render the day prompt for the given day and phase"""
+    return render_day(**day_prompt_values(day_number, day_phase, dialogues))
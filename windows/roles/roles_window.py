@@ -2,7 +2,7 @@ import tkinter as tk
 from tkinter import messagebox
 import customtkinter as ctk
 from utils import utils
-from PIL import Image
+from journal import EventType
 from typing import List, Tuple, Dict
 from dataclasses import dataclass
 
@@ -212,16 +212,7 @@ class RoleManager:
     
     def _count_roles(self) -> Dict[str, int]:
         """Count how many of each role are assigned"""
-        role_count = {
-            "": 0,
-            "villager": 0,
-            "mafia": 0,
-            "sheriff": 0,
-            "doctor": 0,
-        }
-        for _, role in utils.db.players_list:
-            role_count[role] += 1
-        return role_count
+        return dict(utils.db.role_counts)  # A copy, so callers can't change the live counters
 
 
 class RolesWindow:
@@ -238,6 +229,10 @@ class RolesWindow:
         self._setup_frames()
         self._create_player_cards()
         self._setup_done_button()
+        
+        # Role options only change when a role fills up or frees up
+        self._available_roles = self.role_manager.get_available_roles()
+        utils.engine.bus.subscribe_widget(self.window, EventType.ROLE_ASSIGNED, self._on_role_assigned)
     
     def _create_window(self) -> tk.Toplevel:
         """Create and configure the toplevel window"""
@@ -317,19 +312,18 @@ class RolesWindow:
         """Bind events for name and role changes"""
         # Name change event
         def on_name_change(event=None):
-            utils.db.change_player_name(card.get_name(), position + 1)
+            utils.engine.rename(position + 1, card.get_name())
         
         card.name_entry.bind("<FocusOut>", on_name_change)
         
         # Role change event
         def on_role_change(selected_role: str):
             try:
-                utils.db.change_players_list(
+                utils.engine.assign(
+                    position + 1,
                     card.get_name(),
-                    selected_role.lower(),
-                    position + 1
+                    selected_role.lower()
                 )
-                self._update_all_role_options()
             except Exception as e:
                 print(f"Error updating role: {e}")
                 messagebox.showerror("Error", f"Failed to update role: {e}")
@@ -337,16 +331,18 @@ class RolesWindow:
         
         card.role_combo.configure(command=on_role_change)
     
-    def _update_all_role_options(self):
-        """Update available roles for all player cards"""
+    def _on_role_assigned(self, topic: str, data: dict):
+        """Update the cards' role options if the assignment changed which roles are left"""
         available_roles = self.role_manager.get_available_roles()
+        if available_roles == self._available_roles:
+            return
+        self._available_roles = available_roles
         for card in self.player_cards:
             card.set_role_values(available_roles)
     
     def _setup_done_button(self):
         """Setup the done button"""
-        normal = Image.open("windows/total_players/done_button/frame_1.png")
-        pressed = Image.open("windows/total_players/done_button/frame_2.png")
+        normal, pressed = utils.button_images("done_button")
         
         done_button = utils.Custom_Buttons(
             self.footer_frame,
@@ -364,13 +360,12 @@ class RolesWindow:
             self.window.update_idletasks()
             
             # Validate all names and roles are filled
-            for name, role in utils.db.players_list:
-                if not name or not role:
-                    messagebox.showwarning(
-                        "Missing Values",
-                        "Some 'Names' and/or 'Roles' are missing!!"
-                    )
-                    return
+            if not utils.engine.roster_complete():
+                messagebox.showwarning(
+                    "Missing Values",
+                    "Some 'Names' and/or 'Roles' are missing!!"
+                )
+                return
             
             # Confirm action
             answer = messagebox.askokcancel(
@@ -379,7 +374,7 @@ class RolesWindow:
                 "names, roles and numbers of players!"
             )
             if answer:
-                utils.db.change_first_disable()
+                utils.engine.lock_roles()
                 self.window.destroy()
         
         self.window.after(100, done_command)
@@ -1,7 +1,6 @@
 import tkinter as tk
 import customtkinter as ctk
 from utils import utils
-from PIL import Image, ImageTk
 from typing import Tuple
 from dataclasses import dataclass
 
@@ -47,14 +46,13 @@ class BackgroundFrame:
         self.image_path = image_path
         self.frame = tk.Frame(parent)
         self.frame.place(relx=relx, rely=rely, relwidth=relwidth, relheight=relheight)
-        self.bg_photo = None  # Keep reference to prevent garbage collection
         self._setup_background()
     
     def _setup_background(self):
         """Setup the background image"""
-        bg_image = Image.open(self.image_path)
-        self.bg_photo = ImageTk.PhotoImage(bg_image.resize((1400, 650)))
-        self.bg_label = tk.Label(self.frame, image=self.bg_photo)
+        self.bg_label = tk.Label(self.frame)
+        self.bg_label.image = utils.shared_image(self.bg_label, self.image_path, 1400, 650)  # type: ignore
+        self.bg_label.config(image=self.bg_label.image)  # type: ignore
         self.bg_label.place(relx=0, rely=0, relheight=1, relwidth=1)
 
 
@@ -243,7 +241,7 @@ class TotalPlayersWindow:
         mafia_num = self.mafia_frame.get_value()
         
         # Update database with new player count
-        utils.db.change_player_num(player_num)
+        utils.engine.set_player_count(player_num)
         
         # Calculate mafia limit
         mafia_limit = self._calculate_mafia_limit(player_num)
@@ -252,7 +250,7 @@ class TotalPlayersWindow:
         if mafia_num >= mafia_limit:
             new_mafia_count = mafia_limit - 1
             self.mafia_frame.set_value(new_mafia_count)
-            utils.db.change_mafia_num(new_mafia_count)
+            utils.engine.set_mafia_count(new_mafia_count)
         
         # Update mafia combo box values
         mafia_values = [str(n) for n in range(1, mafia_limit)]
@@ -267,12 +265,11 @@ class TotalPlayersWindow:
     def _on_mafia_change(self):
         """Handle mafia count change"""
         mafia_num = self.mafia_frame.get_value()
-        utils.db.change_mafia_num(mafia_num)
+        utils.engine.set_mafia_count(mafia_num)
     
     def _setup_done_button(self):
         """Setup the done button"""
-        normal = Image.open("windows/total_players/done_button/frame_1.png")
-        pressed = Image.open("windows/total_players/done_button/frame_2.png")
+        normal, pressed = utils.button_images("done_button")
         
         done_button = utils.Custom_Buttons(
             self.main_frame.frame,